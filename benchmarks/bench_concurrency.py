@@ -0,0 +1,71 @@
+"""
+Подбор параллельности обхода каталога на подменном API (test_lidertex/standin.py).
+
+Поднимает подменный сервер с заданными задержкой, разбросом и долей ошибок
+и замеряет Parser.get_products при разных значениях concurrency, с повторами
+и адаптивным лимитом параллельности (resilience.Resilience).
+
+Запуск:
+    python benchmarks/bench_concurrency.py [--catalog-size 20000] [--latency 0.1] [--jitter 0.05]
+                                           [--rate-429 0.02] [--rate-5xx 0.01] [--levels 1,2,4,8,16]
+                                           [--fixtures records.zip]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'test_lidertex'))
+
+from fixtures import load_fixtures  # noqa: E402
+from parser import POOL_SIZES, Parser  # noqa: E402
+from resilience import Resilience  # noqa: E402
+from session import HttpSession  # noqa: E402
+from standin import start_server  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--catalog-size', type=int, default=20_000)
+    arg_parser.add_argument('--latency', type=float, default=0.1, help='задержка ответа, с')
+    arg_parser.add_argument('--jitter', type=float, default=0.05, help='разброс задержки ±, с')
+    arg_parser.add_argument('--rate-429', type=float, default=0.0, help='доля ответов 429')
+    arg_parser.add_argument('--rate-5xx', type=float, default=0.0, help='доля ответов 5xx')
+    arg_parser.add_argument('--levels', default='1,2,4,8,16', help='значения concurrency через запятую')
+    arg_parser.add_argument('--fixtures', help='архив записанных ответов вместо синтетического каталога')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    server = start_server(
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        catalog_size=args.catalog_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        seed=args.seed,
+    )
+    print(f'Подменный API: {server.url}, задержка {args.latency}±{args.jitter} с, '
+          f'429: {args.rate_429:.0%}, 5xx: {args.rate_5xx:.0%}')
+
+    for concurrency in (int(level) for level in args.levels.split(',')):
+        pool_sizes = {**POOL_SIZES, 'catalog.wb.ru': concurrency}
+        resilience = Resilience(host_limits=pool_sizes)
+        parser = Parser(session=HttpSession(pool_sizes, api_root=server.url, resilience=resilience))
+        server.counts.clear()
+        start = time.perf_counter()
+        try:
+            products = parser.get_products(concurrency)
+            outcome = f'товаров: {len(products)}'
+        except Exception as e:
+            outcome = f'ошибка: {e}'
+        elapsed = time.perf_counter() - start
+        responses = ', '.join(f'{status}: {count}' for status, count in sorted(server.counts.items()))
+        catalog = resilience.stats().get('catalog.wb.ru', {})
+        print(f'concurrency={concurrency:<3} {elapsed:7.2f} с   {outcome}   ответы [{responses}]   '
+              f'повторов: {catalog.get("retries", 0)}, итоговый лимит: {catalog.get("limit")}')
+        parser.session.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Набор бенчмарков: парсер, объединение с локальными данными, аналитика и страницы.
+
+Замеряет на синтетических каталогах заданных размеров (по умолчанию 1k/100k/1M SKU):
+  parser.get_records[<режим>]  — разбор страниц каталога (записанных или синтетических) в записи;
+  parser.get_products[<режим>] — то же в dict с подписями;
+  parser.get_local_json        — чтение локального JSON;
+  parser.get_combined_data     — прежнее объединение по строкам;
+  parser.get_combined_frame    — колоночное объединение (холодный и тёплый кэш local_cache);
+  graphs.* / abc_graph.*       — все функции построения графиков;
+  page.<страница>              — полный прогон app.py через streamlit AppTest.
+
+Результаты дописываются строкой JSON в историю (--history) и сравниваются
+с базовым запуском: последним в истории или с коммитом --baseline.
+Замедление сильнее --threshold раз считается регрессией (код выхода 1).
+
+Запуск:
+    python benchmarks/bench_suite.py [--sizes 1000,100000] [--only graphs] [--pages-dir DIR]
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.join(BENCH_DIR, '..', 'test_lidertex')
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import abc_graph  # noqa: E402
+import graphs  # noqa: E402
+from bench_validation import load_pages, synthetic_page  # noqa: E402
+from models import ProductRecord  # noqa: E402
+from parser import VALIDATION_MODES, Parser  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+HISTORY_PATH = os.path.join(BENCH_DIR, 'results', 'history.jsonl')
+
+# Во сколько раз медленнее базового запуска считается регрессией
+DEFAULT_THRESHOLD = 1.25
+# Сколько раз повторяется замер; повторы прекращаются, если замер занял больше TIME_BUDGET секунд
+DEFAULT_REPEAT = 5
+TIME_BUDGET = 10.0
+
+# Разбор страниц и прогон страниц приложения на больших каталогах занимают минуты,
+# поэтому по умолчанию ограничены размером; границы меняются флагами
+DEFAULT_PARSE_MAX = 100_000
+DEFAULT_RENDER_MAX = 100_000
+PAGES = ('table', 'graphs')
+
+GROUPS = ('parser', 'join', 'graphs', 'pages')
+
+PRODUCTS_PER_PAGE = 100
+SERIES_LENGTH = 30
+
+
+def series_strings(matrix):
+    return [', '.join(map(str, row)) for row in matrix.tolist()]
+
+
+def synthetic_local(skus, rng):
+    """Записи локальных данных той же структуры, что local_data.json."""
+    n = len(skus)
+    sales = rng.poisson(5, (n, SERIES_LENGTH))
+    stock = rng.integers(0, 200, (n, SERIES_LENGTH))
+    price = rng.integers(500, 3000, (n, SERIES_LENGTH))
+    columns = {
+        'SKU': skus.tolist(),
+        'Выручка, ₽': rng.integers(0, 10 ** 6, n).tolist(),
+        'Упущенная выручка, ₽': rng.integers(0, 10 ** 5, n).tolist(),
+        'Продажи, кол-во': sales.sum(axis=1).tolist(),
+        'График продаж': series_strings(sales),
+        'Оборачиваемость, дн.': np.round(rng.uniform(0, 60, n), 2).tolist(),
+        'График остатков': series_strings(stock),
+        'Скидка': rng.integers(0, 90, n).tolist(),
+        'График изменения цены': series_strings(price),
+        'Дробный рейтинг': np.round(rng.uniform(3, 5, n), 1).tolist(),
+        'Ср. рейтинг последних отзывов': np.round(rng.uniform(3, 5, n), 2).tolist(),
+        'Дней на маркетплейсе': rng.integers(1, 1500, n).tolist(),
+        'Средняя рекламная ставка, ₽': np.where(rng.random(n) < 0.3, rng.integers(1, 500, n), 0).tolist(),
+    }
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def synthetic_products(skus, rng):
+    """Товары каталога в виде models.ProductRecord."""
+    n = len(skus)
+    ratings = np.round(rng.uniform(3, 5, n), 1).tolist()
+    feedbacks = rng.integers(0, 5000, n).tolist()
+    promo = np.where(rng.random(n) < 0.5, 'Весенняя распродажа', 'Нет акции').tolist()
+    prices = (rng.integers(10_000, 300_000, n) / 100).tolist()
+    stock = rng.integers(0, 1000, n).tolist()
+    colors = rng.integers(1, 4, n).tolist()
+    pics = rng.integers(1, 20, n).tolist()
+    return [
+        ProductRecord(
+            id=sku,
+            name=f'Товар {sku}',
+            rating=ratings[i],
+            feedbacks=feedbacks[i],
+            promo=promo[i],
+            price=prices[i],
+            stock=stock[i],
+            colors=colors[i],
+            pics=pics[i],
+        )
+        for i, sku in enumerate(skus.tolist())
+    ]
+
+
+class Workspace:
+    """Синтетический каталог размера n во временном каталоге."""
+
+    def __init__(self, n, root):
+        rng = np.random.default_rng(n)
+        self.n = n
+        self.skus = rng.choice(10 ** 9, size=n, replace=False) + 10 ** 8
+        self.local_path = os.path.join(root, f'local_{n}', 'local_data.json')
+        os.makedirs(os.path.dirname(self.local_path))
+        with open(self.local_path, 'w', encoding='utf-8') as file:
+            json.dump(synthetic_local(self.skus, rng), file, ensure_ascii=False)
+        self.products = synthetic_products(self.skus, rng)
+
+    def parser(self):
+        """Parser, который вместо каталога WB отдаёт синтетические товары."""
+        parser = Parser(local_data_path=self.local_path)
+        parser.get_records = lambda *args, **kwargs: self.products
+        return parser
+
+    def clear_local_cache(self):
+        shutil.rmtree(os.path.join(os.path.dirname(self.local_path), '.cache'), ignore_errors=True)
+
+
+def recorded_parser(pages):
+    """Parser, который отдаёт записанные тела страниц каталога вместо запросов к WB."""
+    parser = Parser()
+
+    def fetch_page_content(page):
+        return pages[page - 1] if page <= len(pages) else b'{"data": {"products": []}}'
+
+    parser.fetch_page_content = fetch_page_content
+    return parser
+
+
+def measure(run, repeat, setup=None):
+    """Лучшее и медианное время run() в секундах; setup() вызывается перед каждым повтором вне замера."""
+    times = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - started > TIME_BUDGET:
+            break
+    return {'best': min(times), 'median': statistics.median(times), 'runs': len(times)}
+
+
+def synthetic_pages(size):
+    n_pages = -(-size // PRODUCTS_PER_PAGE)
+    return [synthetic_page(page, PRODUCTS_PER_PAGE, total=size) for page in range(1, n_pages + 1)]
+
+
+def bench_parser(args, pages):
+    results = {}
+    for mode in VALIDATION_MODES:
+        parser = recorded_parser(pages)
+        results[f'parser.get_records[{mode}]'] = measure(lambda: parser.get_records(1, mode), args.repeat)
+        results[f'parser.get_products[{mode}]'] = measure(lambda: parser.get_products(1, mode), args.repeat)
+    return results
+
+
+def bench_join(args, workspace):
+    parser = workspace.parser()
+    return {
+        'parser.get_local_json': measure(parser.get_local_json, args.repeat),
+        'parser.get_combined_data': measure(parser.get_combined_data, args.repeat),
+        'parser.get_combined_frame[cold]': measure(parser.get_combined_frame, args.repeat,
+                                                   setup=workspace.clear_local_cache),
+        'parser.get_combined_frame[warm]': measure(parser.get_combined_frame, args.repeat),
+    }
+
+
+def plot_functions():
+    for module in (graphs, abc_graph):
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('plot_') and function.__module__ == module.__name__:
+                yield f'{module.__name__}.{name}', function
+
+
+def bench_graphs(args, workspace):
+    frame = workspace.parser().get_combined_frame()
+    return {name: measure(lambda: function(frame), args.repeat) for name, function in plot_functions()}
+
+
+def bench_pages(args, workspace, root):
+    """Полный прогон app.py на сохранённом снимке синтетического каталога, без сети."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from snapshots import SnapshotStore
+
+    snapshot_dir = os.path.join(root, f'snapshots_{workspace.n}')
+    SnapshotStore(snapshot_dir).write(workspace.parser().get_combined_frame())
+    os.environ['LIDERTEX_SNAPSHOT_DIR'] = snapshot_dir
+    os.environ['LIDERTEX_REFRESH_INTERVAL'] = '0'
+    # Модули приложения читают настройки при импорте: сбрасываем их и кэши Streamlit
+    for module in ('caching', 'refresher', 'snapshots'):
+        sys.modules.pop(module, None)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    results = {}
+    for page in PAGES:
+        def render():
+            app = AppTest.from_file(os.path.join(PACKAGE_DIR, 'app.py'), default_timeout=600)
+            app.session_state.page = page
+            app.run()
+            if app.exception:
+                raise RuntimeError(f'Страница {page}: {app.exception[0].value}')
+
+        # Первый прогон прогревает кэши процесса, как у второго аналитика за утро
+        results[f'page.{page}[cold]'] = measure(render, 1)
+        results[f'page.{page}[warm]'] = measure(render, args.repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def find_baseline(history, commit=None):
+    for entry in reversed(history):
+        if commit is None or (entry.get('commit') or '').startswith(commit):
+            return entry
+    return None
+
+
+def compare(results, baseline, threshold):
+    """Печатает сравнение с базовым запуском; возвращает список регрессий."""
+    regressions = []
+    previous = {(r['name'], r['size']): r for r in baseline['results']} if baseline else {}
+    for result in results:
+        line = f"{result['name']:<48} {result['size']:>9} {result['best'] * 1000:11.1f} мс"
+        before = previous.get((result['name'], result['size']))
+        if before:
+            ratio = result['best'] / before['best']
+            line += f'   x{ratio:.2f}'
+            if ratio > threshold:
+                line += '   РЕГРЕССИЯ'
+                regressions.append(result)
+        print(line)
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help='размеры каталогов через запятую')
+    arg_parser.add_argument('--only', action='append', choices=GROUPS, help='запустить только эти группы')
+    arg_parser.add_argument('--pages-dir', help='каталог с записанными страницами *.json для разбора')
+    arg_parser.add_argument('--parse-max', type=int, default=DEFAULT_PARSE_MAX,
+                            help='наибольший каталог для разбора синтетических страниц')
+    arg_parser.add_argument('--render-max', type=int, default=DEFAULT_RENDER_MAX,
+                            help='наибольший каталог для прогона страниц приложения')
+    arg_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='число повторов, берётся лучший')
+    arg_parser.add_argument('--history', default=HISTORY_PATH, help='файл истории запусков (JSONL)')
+    arg_parser.add_argument('--baseline', help='коммит базового запуска; по умолчанию последний в истории')
+    arg_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='во сколько раз медленнее базового считается регрессией')
+    arg_parser.add_argument('--no-save', action='store_true', help='не дописывать результат в историю')
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    groups = args.only or GROUPS
+    recorded = load_pages(args.pages_dir) if args.pages_dir else None
+    if args.pages_dir and not recorded:
+        sys.exit(f'В {args.pages_dir} нет файлов *.json')
+
+    results = []
+
+    def record(size, measured):
+        for name, timing in measured.items():
+            results.append({'name': name, 'size': size, **timing})
+
+    root = tempfile.mkdtemp(prefix='lidertex-bench-')
+    try:
+        # Записанные страницы разбираются один раз как есть, синтетические — для каждого размера
+        if 'parser' in groups and recorded:
+            record(sum(len(json.loads(page)['data']['products']) for page in recorded),
+                   bench_parser(args, recorded))
+        for size in sizes:
+            print(f'Каталог {size} SKU...', file=sys.stderr)
+            if 'parser' in groups and not recorded and size <= args.parse_max:
+                record(size, bench_parser(args, synthetic_pages(size)))
+            if not {'join', 'graphs', 'pages'} & set(groups):
+                continue
+            workspace = Workspace(size, root)
+            if 'join' in groups:
+                record(size, bench_join(args, workspace))
+            if 'graphs' in groups:
+                record(size, bench_graphs(args, workspace))
+            if 'pages' in groups and size <= args.render_max:
+                record(size, bench_pages(args, workspace, root))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    history = read_history(args.history)
+    baseline = find_baseline(history, args.baseline)
+    if baseline:
+        print(f"Базовый запуск: {baseline['timestamp']} ({baseline.get('commit')})")
+    regressions = compare(results, baseline, args.threshold)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.node(),
+            'results': results,
+        }
+        with open(args.history, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    if regressions:
+        sys.exit(f'Регрессий: {len(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
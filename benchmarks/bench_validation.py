@@ -0,0 +1,109 @@
+"""
+Микробенчмарк валидации страниц каталога.
+
+Сравнивает режимы Parser.get_products на записанных страницах:
+  strict  — json.loads + Data.model_validate (прежний путь);
+  fast    — Payload.model_validate_json по байтам каждой страницы;
+  trusted — Parser.get_records(mode='trusted') на тех же страницах повторно: все страницы
+            уже проверены в первом проходе (прогрев), замеряется путь без валидации —
+            хэш тела, сверка с Parser.validated_pages, json.loads + Product.record_from_raw.
+
+Запуск:
+    python benchmarks/bench_validation.py [каталог_с_страницами] [--repeat N]
+
+Каталог должен содержать тела ответов catalog.wb.ru в файлах *.json.
+Без каталога используются синтетические страницы той же структуры.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'test_lidertex'))
+
+from cache import ResponseCache  # noqa: E402
+from models import Data, Payload  # noqa: E402
+from parser import Parser  # noqa: E402
+from standin import synthetic_catalog_page as synthetic_page  # noqa: E402
+
+EMPTY_PAGE = json.dumps({'data': {'products': []}}).encode()
+
+
+def load_pages(directory):
+    if not directory:
+        return [synthetic_page(page) for page in range(1, 31)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+    return pages
+
+
+def run_strict(pages):
+    rows = []
+    for content in pages:
+        data = Data.model_validate(json.loads(content)['data'])
+        rows.extend(product.extract_data() for product in data.products)
+    return rows
+
+
+def run_fast(pages):
+    rows = []
+    for content in pages:
+        data = Payload.model_validate_json(content).data
+        rows.extend(product.extract_data() for product in data.products)
+    return rows
+
+
+def trusted_runner(pages):
+    """
+    Прогон режима trusted через Parser без сети: страницы отдаются из pages.
+    Parser общий для всех прогонов, поэтому первый (сверка результата) проверяет
+    страницы, а замеряемые повторы идут по пути без валидации.
+    """
+    parser = Parser(cache=ResponseCache())
+    parser.fetch_page_content = lambda page: pages[page - 1] if page <= len(pages) else EMPTY_PAGE
+
+    def run(pages):
+        return [record.to_dict() for record in parser.get_records(1, 'trusted')]
+    return run
+
+
+MODES = {
+    'strict': lambda pages: run_strict,
+    'fast': lambda pages: run_fast,
+    'trusted': trusted_runner,
+}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('pages_dir', nargs='?', help='каталог с записанными страницами *.json')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='число повторов, берётся лучший')
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.pages_dir)
+    if not pages:
+        sys.exit(f'В {args.pages_dir} нет файлов *.json')
+    reference = run_strict(pages)
+    print(f'Страниц: {len(pages)}, товаров: {len(reference)}, '
+          f'объём: {sum(map(len, pages)) / 1024:.0f} КБ')
+
+    baseline = None
+    for name, make_runner in MODES.items():
+        run = make_runner(pages)
+        if run(pages) != reference:
+            sys.exit(f'Режим {name} дал результат, отличный от strict')
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run(pages)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f'{name:<8} {best * 1000:8.1f} мс   x{baseline / best:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+"""Пакетный обход без Streamlit: python -m test_lidertex ... или скрипт lidertex (см. cli)."""
+import os
+import sys
+
+
+def main(argv=None):
+    # Модули приложения импортируют друг друга по плоским именам (app.py запускает Streamlit
+    # как скрипт). Каталог пакета добавляется в sys.path только здесь, в процессе самой
+    # команды, а не при импорте пакета test_lidertex
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    if package_dir not in sys.path:
+        sys.path.insert(0, package_dir)
+    from cli import main as cli_main
+    return cli_main(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
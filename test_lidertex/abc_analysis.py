@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from series import SALES_COLUMN, parse_series
+
+# Метрики, по которым можно строить ABC-анализ: ключ -> столбец данных
+ABC_METRICS = {
+    'units': 'Продажи, кол-во',
+    'revenue': 'Выручка, ₽',
+    'lost_revenue': 'Упущенная выручка, ₽',
+}
+
+# Границы кумулятивной доли: A — до 80%, B — до 95%, C — остальное
+ABC_THRESHOLDS = (0.80, 0.95)
+# Границы коэффициента вариации дневных продаж: X — до 10%, Y — до 25%, Z — выше
+XYZ_THRESHOLDS = (0.10, 0.25)
+
+# Сколько результатов анализа держим в памяти (разные версии данных и метрики)
+CACHE_SIZE = 16
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class AbcAnalysis:
+    """
+    Результат ABC/XYZ-анализа.
+
+    order, sorted_values и cumulative_share — в порядке убывания метрики;
+    abc и xyz выровнены со строками исходного DataFrame.
+    """
+
+    def __init__(self, metric, order, sorted_values, cumulative_share, abc, xyz):
+        self.metric = metric
+        self.order = order
+        self.sorted_values = sorted_values
+        self.cumulative_share = cumulative_share
+        self.abc = abc
+        self.xyz = xyz
+
+    def classes_frame(self, index):
+        """Классы ABC и XYZ в виде DataFrame с заданным индексом (для таблиц)."""
+        return pd.DataFrame({'ABC': self.abc, 'XYZ': self.xyz}, index=index)
+
+
+def abc_classes(values, thresholds=ABC_THRESHOLDS):
+    """
+    Векторный ABC: сортировка по убыванию, кумулятивная доля через cumsum
+    и класс через searchsorted по границам thresholds.
+    Возвращает (order, sorted_values, cumulative_share, abc по исходным строкам).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(-values, kind='stable')
+    sorted_values = values[order]
+    total = sorted_values.sum()
+    if total > 0:
+        cumulative_share = np.cumsum(sorted_values) / total
+    else:
+        # Без продаж все товары попадают в C
+        cumulative_share = np.full(len(values), np.nan)
+
+    # side='left': доля, равная границе, остаётся в младшем классе (≤ 80% — это A)
+    sorted_classes = np.array(['A', 'B', 'C'])[np.searchsorted(thresholds, cumulative_share, side='left')]
+    abc = np.empty(len(values), dtype='<U1')
+    abc[order] = sorted_classes
+    return order, sorted_values, cumulative_share, abc
+
+
+def xyz_classes(sales, thresholds=XYZ_THRESHOLDS):
+    """
+    XYZ по коэффициенту вариации дневных продаж (SeriesMatrix).
+    Товары без продаж относятся к Z, строки с невалидным рядом получают пустой класс.
+    """
+    mean = sales.values.mean(axis=1)
+    std = sales.values.std(axis=1)
+    cv = np.divide(std, mean, out=np.full(len(mean), np.inf), where=mean > 0)
+    xyz = np.array(['X', 'Y', 'Z'])[np.searchsorted(thresholds, cv, side='left')]
+    return np.where(sales.valid, xyz, '')
+
+
+def analyze(df, metric='units', sales=None, version=None,
+            abc_thresholds=ABC_THRESHOLDS, xyz_thresholds=XYZ_THRESHOLDS):
+    """
+    ABC/XYZ-анализ df по метрике из ABC_METRICS.
+
+    sales — разобранный "График продаж" (SeriesMatrix), выровненный с df.
+    Результат кэшируется по (version, metric, границы); если version не передан,
+    он вычисляется хэшированием нужных столбцов.
+    """
+    column = ABC_METRICS[metric]
+    if version is None:
+        row_hashes = pd.util.hash_pandas_object(df[[column, SALES_COLUMN]], index=False).to_numpy()
+        version = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+    key = (version, metric, tuple(abc_thresholds), tuple(xyz_thresholds))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    if sales is None:
+        sales = parse_series(df[SALES_COLUMN])
+    order, sorted_values, cumulative_share, abc = abc_classes(df[column].to_numpy(), abc_thresholds)
+    result = AbcAnalysis(column, order, sorted_values, cumulative_share, abc, xyz_classes(sales, xyz_thresholds))
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
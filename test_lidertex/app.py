@@ -1,7 +1,10 @@
-import streamlit as st
+import time
+
 import pandas as pd
-from parser import Parser
-import io
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, NamedTuple
 
 from graphs import (plot_total_daily_sales, 
                     plot_price_vs_sales, 
@@ -13,6 +16,25 @@ from graphs import (plot_total_daily_sales,
                     plot_photos_distribution,
                     plot_marketplace_days_distribution)
 from abc_graph import plot_abc_classic
+from abc_analysis import ABC_METRICS, analyze
+from export import EXPORT_FORMATS
+from metrics import REGISTRY, observe
+from table_view import PAGE_SIZES, STOCK_COLUMN, page_count, stock_styles, table_page
+from caching import (cached_figure,
+                     export_file,
+                     get_legal_info,
+                     get_metrics_server,
+                     get_parser,
+                     get_refresher,
+                     get_seller_info,
+                     get_votes,
+                     invalidate)
+
+# Как часто строка состояния проверяет, не опубликована ли новая версия данных, в секундах
+STATUS_INTERVAL = 5
+
+# Начало прогона скрипта: полное время прогона уходит в метрику page_render_seconds
+render_started = time.perf_counter()
 
 # Запуск приложения в режиме Wide mode с темным оформлением
 st.set_page_config(layout="wide", page_title="Данные о продавце Лидер Дом")
@@ -38,26 +60,259 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-def load_data():
-    parser = Parser()
-    return parser.get_combined_data()
+def use_version(published):
+    """
+    Раскладывает опубликованную фоновым обновлением версию данных (refresher.DatasetVersion)
+    по session_state: таблица, её версия, разобранные 30-дневные ряды и изменения.
+    """
+    st.session_state.data = published.frame
+    st.session_state.data_version = published.version
+    st.session_state.series = published.series
+    st.session_state.changes = published.changes
+
+def format_age(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "меньше минуты"
+    if minutes < 60:
+        return f"{minutes} мин"
+    return f"{minutes // 60} ч {minutes % 60} мин"
+
+@st.fragment(run_every=STATUS_INTERVAL)
+def render_data_status():
+    """
+    Строка состояния данных: возраст опубликованной версии и ход фонового обновления.
+    Когда опубликована новая версия, перезапускает страницу, чтобы показать её.
+    """
+    refresher = get_refresher()
+    published = refresher.latest()
+    if published is not None and published.version != st.session_state.get('data_version'):
+        st.rerun(scope='app')
+
+    if published is None:
+        status = "Данные загружаются впервые, страница обновится автоматически"
+    else:
+        source = "Показан сохранённый снимок" if published.source == 'snapshot' else "Показаны данные"
+        status = (f"{source} от {published.published_at:%d.%m.%Y %H:%M} UTC "
+                  f"({format_age(published.age())} назад)")
+        if published.changes is not None:
+            status += f"; {published.changes.summary()}"
+    if refresher.refreshing:
+        status += " · идёт обновление..."
+    st.caption(status)
+    if refresher.last_error is not None:
+        st.warning(f"Последнее обновление не удалось ({refresher.last_error_at:%H:%M} UTC): {refresher.last_error}")
+
+# Разделы страницы "Информация": каждый рисуется из своего источника
+def render_legal_info(legal_info):
+    st.markdown(f"**Краткое название:** {legal_info.get('Краткое название', '')}")
+    st.markdown(f"**Полное название:** {legal_info.get('Полное название', '')}")
+    st.markdown(f"**ИНН:** {legal_info.get('ИНН', '')}")
+    st.markdown(f"**ОГРН:** {legal_info.get('ОГРН', '')}")
+    st.markdown(f"**Юридический адрес:** {legal_info.get('Юридический адрес', '')}")
+    st.markdown(f"**Торговая марка:** {legal_info.get('Торговая марка', '')}")
+
+def render_seller_info(seller_info):
+    st.markdown(f"🖥️ **Ссылка на магазин:** [Перейти]({seller_info.get('Ссылка на магазин', '')})")
+    st.markdown(f":star: **Средняя оценка:** {seller_info.get('Средняя оценка', '')}")
+    st.markdown(f"👍 **Общее количество отзывов:** {seller_info.get('Количество отзывов', '')}")
+    st.markdown(f"🗓️ **Дата регистрации:** {seller_info.get('Дата регистрации', '')}")
+    st.markdown(f"🤑 **Общее количество продаж:** {seller_info.get('Общее количество продаж', '')}")
+    st.markdown(f"😄 **Процент выкупа:** {seller_info.get('Процент выкупа', '')}%")
+    st.markdown(f"📜 **Джем:** {seller_info.get('Джем', '')}")
+
+def render_votes(votes):
+    st.markdown(f"💟 **Количество добавлений магазина в избранное:** {votes}")
+
+def render_company_info():
+    """
+    Запрашивает три источника информации о компании параллельно и рисует
+    каждый раздел, как только пришёл его ответ. Ошибка одного источника
+    заменяет предупреждением только его раздел.
+    """
+    parser = get_parser()
+    sections = [
+        (None, lambda: get_legal_info(parser.supplier_id), render_legal_info, "юридическую информацию"),
+        ("### Информация о продавце 🕵️", lambda: get_seller_info(parser.supplier_id), render_seller_info,
+         "информацию о продавце"),
+        ("### Избранное :heart:", lambda: get_votes(parser.brand_id), render_votes,
+         "количество добавлений в избранное"),
+    ]
+
+    placeholders = []
+    for header, _, _, _ in sections:
+        if header:
+            st.markdown(header)
+        placeholder = st.empty()
+        placeholder.caption("Загрузка...")
+        placeholders.append(placeholder)
+
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = {executor.submit(fetch): i for i, (_, fetch, _, _) in enumerate(sections)}
+        for future in as_completed(futures):
+            i = futures[future]
+            _, _, render, name = sections[i]
+            with placeholders[i].container():
+                try:
+                    render(future.result())
+                except Exception as e:
+                    st.warning(f"Не удалось получить {name}: {e}")
+
+# Разделы страницы "Графики". Каждый раздел — фрагмент: график строится только
+# после того, как раздел открыт, а переключение раздела перезапускает только его
+def graph_total_daily_sales(df, version):
+    fig_sales = cached_figure(plot_total_daily_sales, version, df, st.session_state.series.sales)
+    st.plotly_chart(fig_sales, use_container_width=True)
+    message_sales = """Всплеск продаж в начале месяца может быть напрямую связан с подготовкой 8 марта. 
+                        Обычно наблюдается повышенный спрос на подарки и сопутствующие товары. 
+                        После, как правило, наблюдается спад продаж, из снижения спроса
+                        и покупательской способности, что и отражается в падении графика продаж к середине и концу месяца.
+                    """
+    st.write(message_sales)
+
+def graph_price_vs_sales(df, version):
+    fig_price = cached_figure(plot_price_vs_sales, version, df)
+    st.plotly_chart(fig_price, use_container_width=True)
+    message_correlation = """
+        Нет ярко выраженной линейной корреляции. Точки распределены достаточно хаотично,
+        хотя и прослеживается тенденция, что самые большие объёмы продаж в среднем ценовом диапазоне. 
+            """
+    st.write(message_correlation)
+
+def graph_reviews_segments(df, version):
+    fig_reviews = cached_figure(plot_reviews_segments, version, df, low_threshold=100)  # можно изменить порог, если нужно
+    st.plotly_chart(fig_reviews, use_container_width=True)
+    message_reviews = """ Значительная часть ассортимента уже успела набрать существенное количество отзывов,
+      что повышает доверие покупателей и облегчает принятие решения о покупке. Тем не менее, почти половина товаров
+        (около 44%) имеет ограниченное количество отзывов, и им может потребоваться дополнительная реклама или стимулирование 
+        оставления отзывов.
+        """
+    st.write(message_reviews)
+
+def graph_sales_action_heatmap(df, version):
+    fig_sales_action = cached_figure(plot_sales_action_heatmap, version, df)
+    st.plotly_chart(fig_sales_action, use_container_width=True)
+
+def graph_photos_distribution(df, version):
+    fig_photos = cached_figure(plot_photos_distribution, version, df, nbins=20)  # можно настроить число интервалов
+    st.plotly_chart(fig_photos, use_container_width=True)
 
-# Функция для получения информации о компании
-def get_company_info():
-    parser = Parser()
-    legal_info = parser.get_legal_info()
-    seller_info = parser.get_seller_info()
-    votes = parser.get_votes()
-    return legal_info, seller_info, votes
+def graph_abc(df, version):
+    abc_metric = st.selectbox("Метрика ABC", options=list(ABC_METRICS), format_func=ABC_METRICS.get)
+    fig = cached_figure(plot_abc_classic, version, df, metric=abc_metric, version=version)
+    st.plotly_chart(fig, use_container_width=True)
+    message_abc = """График подтверждает «правило Парето» (20% товаров приносят 80% продаж) 
+                или близкий к нему принцип. Чем круче поднимается оранжевая кривая кумулятивной 
+                доли в начале и чем длиннее «хвост» справа, тем сильнее выражена концентрация 
+                продаж в ограниченном наборе позиций.
+             """
+    st.write(message_abc)
 
-# Определяем текущую страницу; по умолчанию – информационная ("info")
+def graph_price_segments(df, version):
+    fig_segments = cached_figure(plot_price_segments, version, df)
+    st.plotly_chart(fig_segments, use_container_width=True)
+    message_segments = """
+         Ассортимент смещён в сторону среднего и высокого ценовых диапазонов. 
+         Это может говорить о том, что компания делает ставку на более дорогие 
+         товары либо ориентируется на аудиторию, готовую тратить больше.
+    """
+    st.write(message_segments)
+
+def graph_ratings_distribution(df, version):
+    fig_ratings = cached_figure(plot_ratings_distribution, version, df)
+    st.plotly_chart(fig_ratings, use_container_width=True)
+    message_reviews_rating = """
+    Основная масса товаров сосредоточена в диапазоне 4–5 звёзд. 
+    Это говорит о том, что большая часть ассортимента получает высокие оценки покупателей, 
+    что в целом свидетельствует о хорошем качестве товаров или удовлетворённости клиентов.
+        """
+    st.write(message_reviews_rating)
+
+def graph_action_distribution(df, version):
+    fig_action = cached_figure(plot_action_distribution, version, df)
+    st.plotly_chart(fig_action, use_container_width=True)
+
+def graph_marketplace_days_distribution(df, version):
+    fig_colors = cached_figure(plot_marketplace_days_distribution, version, df, nbins=50)
+    st.plotly_chart(fig_colors, use_container_width=True)
+
+class GraphSection(NamedTuple):
+    key: str
+    title: str
+    render: Callable
+    # 0 — левая колонка страницы, 1 — правая
+    column: int
+    # Открыт ли раздел при первом показе страницы
+    expanded: bool = False
+
+GRAPH_SECTIONS = [
+    GraphSection('total_daily_sales', "Динамика суммарных продаж за 30 дней", graph_total_daily_sales, 0, True),
+    GraphSection('price_vs_sales', "Анализ корреляции между ценой и продажами", graph_price_vs_sales, 0),
+    GraphSection('reviews_segments', "Кластеризация товаров по количеству отзывов", graph_reviews_segments, 0),
+    GraphSection('sales_action', "Акции & Продажи", graph_sales_action_heatmap, 0),
+    GraphSection('photos', "Количество фото в карточке товара", graph_photos_distribution, 0),
+    GraphSection('abc', "ABC анализ", graph_abc, 1, True),
+    GraphSection('price_segments', "Ценовая сегментация", graph_price_segments, 1),
+    GraphSection('ratings', "Кластеризация товаров по рейтингу", graph_ratings_distribution, 1),
+    GraphSection('action', "Участие в акции", graph_action_distribution, 1),
+    GraphSection('marketplace_days', "Дней на маркетплейсе", graph_marketplace_days_distribution, 1),
+]
+
+@st.fragment
+def render_graph_section(section):
+    st.subheader(section.title)
+    if st.toggle("Показать", value=section.expanded, key=f"graph_{section.key}"):
+        section.render(st.session_state.data, st.session_state.data_version)
+
+def render_diagnostics():
+    """
+    Скрытая страница диагностики (?page=diagnostics): сводка метрик процесса,
+    состояние повторов и автоматов по хостам, пул соединений и фоновое обновление.
+    """
+    st.title("Диагностика")
+    st.subheader("Метрики")
+    summary = REGISTRY.summary()
+    if summary:
+        st.dataframe(pd.DataFrame(summary), hide_index=True)
+    else:
+        st.caption("Наблюдений пока нет")
+
+    parser = get_parser()
+    if parser.session.resilience is not None:
+        st.subheader("Повторы и автоматы по хостам")
+        st.dataframe(pd.DataFrame.from_dict(parser.session.resilience.stats(), orient='index'))
+    st.subheader("Соединения")
+    st.dataframe(pd.DataFrame.from_dict(parser.connection_stats(), orient='index'))
+
+    refresher = get_refresher()
+    published = refresher.latest()
+    st.subheader("Фоновое обновление")
+    st.json({
+        'interval': refresher.interval,
+        'refreshing': refresher.refreshing,
+        'version': published.version if published else None,
+        'source': published.source if published else None,
+        'age_seconds': round(published.age(), 1) if published else None,
+        'last_error': str(refresher.last_error) if refresher.last_error else None,
+    })
+
+    with st.expander("Prometheus"):
+        st.code(REGISTRY.prometheus_text(), language='text')
+
+get_metrics_server()
+
+# Определяем текущую страницу; по умолчанию – информационная ("info").
+# Страница диагностики в навигации не показана, её открывает адрес ?page=diagnostics
 if 'page' not in st.session_state:
-    st.session_state.page = 'info'
+    st.session_state.page = 'diagnostics' if st.query_params.get('page') == 'diagnostics' else 'info'
+
+# Данные обновляет фоновый поток (см. refresher.Refresher); сессия берёт
+# последнюю опубликованную версию и не ждёт сети
+published = get_refresher().latest()
+if published is not None and published.version != st.session_state.get('data_version'):
+    use_version(published)
 
-# Загружаем данные при первом запуске (для таблицы)
-if 'data' not in st.session_state:
-    st.session_state.data = load_data()
-    st.success("Данные получены")
+render_data_status()
 
 # Верхняя навигация (добавляем четвёртую колонку для кнопки "Обновить данные")
 col1, col2, col3, col4 = st.columns(4)
@@ -73,39 +328,27 @@ with col3:
         st.session_state.page = 'graphs'
 with col4:
     if st.button("Обновить данные"):
-        st.session_state.data = load_data()
-        st.success("Данные обновлены")
+        invalidate()
+        get_refresher().request_refresh()
+        st.info("Обновление запущено, новые данные появятся автоматически")
+
+# Таблице и графикам нужны данные; до первой публикации показываем только "Информацию"
+if st.session_state.page in ('table', 'graphs') and 'data' not in st.session_state:
+    st.info("Данные ещё загружаются, страница обновится автоматически")
+    st.stop()
 
 # Страница "Информация" (главная)
 if st.session_state.page == 'info':
     st.title("Информация о компании :office:")
     
-    legal_info, seller_info, votes = get_company_info()
-    st.markdown(f"**Краткое название:** {legal_info.get('Краткое название', '')}")
-    st.markdown(f"**Полное название:** {legal_info.get('Полное название', '')}")
-    st.markdown(f"**ИНН:** {legal_info.get('ИНН', '')}")
-    st.markdown(f"**ОГРН:** {legal_info.get('ОГРН', '')}")
-    st.markdown(f"**Юридический адрес:** {legal_info.get('Юридический адрес', '')}")
-    st.markdown(f"**Торговая марка:** {legal_info.get('Торговая марка', '')}")
-    
-    st.markdown("### Информация о продавце 🕵️")
-    st.markdown(f"🖥️ **Ссылка на магазин:** [Перейти]({seller_info.get('Ссылка на магазин', '')})")
-    st.markdown(f":star: **Средняя оценка:** {seller_info.get('Средняя оценка', '')}")
-    st.markdown(f"👍 **Общее количество отзывов:** {seller_info.get('Количество отзывов', '')}")
-    st.markdown(f"🗓️ **Дата регистрации:** {seller_info.get('Дата регистрации', '')}")
-    st.markdown(f"🤑 **Общее количество продаж:** {seller_info.get('Общее количество продаж', '')}")
-    st.markdown(f"😄 **Процент выкупа:** {seller_info.get('Процент выкупа', '')}%")
-    st.markdown(f"📜 **Джем:** {seller_info.get('Джем', '')}")
-    
-    st.markdown("### Избранное :heart:")
-    st.markdown(f"💟 **Количество добавлений магазина в избранное:** {votes}")
+    render_company_info()
 
 # Страница "Сводная таблица" с фильтрами и таблицей
 elif st.session_state.page == 'table':
     st.title("Сводная таблица")
     
-    # Преобразуем данные в DataFrame
-    df = pd.DataFrame(st.session_state.data)
+    # Данные уже лежат в типизированном DataFrame, общем для всех страниц
+    df = st.session_state.data
     
     st.sidebar.subheader("Фильтры")
     
@@ -150,6 +393,12 @@ elif st.session_state.page == 'table':
     ad_options = ["Все", "Участвует", "Не участвует"]
     ad_filter = st.sidebar.radio("Участие в рекламной кампании", options=ad_options, index=0)
     
+    # ABC/XYZ-классы считаются по всему ассортименту до фильтрации
+    abc_metric = st.sidebar.selectbox("Метрика ABC", options=list(ABC_METRICS), format_func=ABC_METRICS.get)
+    abc_result = analyze(df, abc_metric, sales=st.session_state.series.sales,
+                         version=st.session_state.data_version)
+    df = df.join(abc_result.classes_frame(df.index))
+    
     # Применяем фильтры к DataFrame
     filtered_df = df[
         (df['Рейтинг'] >= rating_filter[0]) & (df['Рейтинг'] <= rating_filter[1]) &
@@ -170,28 +419,30 @@ elif st.session_state.page == 'table':
     # Определяем столбцы для отображения: убираем столбец оборачиваемости, добавляем SKU
     display_columns = [
         'Название', 'Рейтинг', 'Количество отзывов', 'Акция', 'Цена (руб)',
-        'Общий остаток', 'SKU', 'Продажи, кол-во', 'Дней на маркетплейсе', 'Средняя рекламная ставка, ₽'
+        'Общий остаток', 'SKU', 'Продажи, кол-во', 'Дней на маркетплейсе', 'Средняя рекламная ставка, ₽',
+        'ABC', 'XYZ'
     ]
     filtered_df = filtered_df[display_columns]
     filtered_df = filtered_df.rename(columns={'Средняя рекламная ставка, ₽': 'Средняя рекламная ставка'})
     
-    # Функция для изменения цвета текста в ячейке "Общий остаток":
-    def highlight_stock(row):
-        try:
-            stock = float(row["Общий остаток"])
-        except:
-            stock = None
-        style = ""
-        if stock is not None:
-            if stock < 30:
-                style = 'color: red'
-            elif stock < 100:
-                style = 'color: yellow'
-            else:
-                style = 'color: lightgreen'
-        return ['' if col != "Общий остаток" else style for col in row.index]
-    
-    styled_df = filtered_df.style.apply(highlight_stock, axis=1)
+    # Сортировка и разбиение на страницы выполняются на сервере:
+    # стилизуется и отправляется в браузер только видимая страница
+    sort_col, order_col, size_col, page_col = st.columns(4)
+    with sort_col:
+        sort_column = st.selectbox("Сортировка", options=[None] + list(filtered_df.columns),
+                                   format_func=lambda column: "—" if column is None else column)
+    with order_col:
+        descending = st.toggle("По убыванию", value=True)
+    with size_col:
+        page_size = st.selectbox("Строк на странице", options=PAGE_SIZES)
+    with page_col:
+        n_pages = page_count(len(filtered_df), page_size)
+        page = st.number_input("Страница", min_value=1, max_value=n_pages, value=1, step=1)
+
+    page_df = table_page(filtered_df, sort_column, not descending, page, page_size)
+
+    # Цвет текста в ячейке "Общий остаток" считается векторно для всего столбца страницы
+    styled_df = page_df.style.apply(stock_styles, subset=[STOCK_COLUMN])
     
     # Форматирование числовых столбцов
     styled_df = styled_df.format({
@@ -204,99 +455,33 @@ elif st.session_state.page == 'table':
     })
     
     st.dataframe(styled_df, use_container_width=True)
+    st.caption(f"Строк: {len(filtered_df)}, страница {page} из {n_pages}")
     
-    # Генерация Excel-файла из отфильтрованного DataFrame
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        filtered_df.to_excel(writer, index=False, sheet_name='FilteredData')
-    excel_data = output.getvalue()
+    # Файл выгрузки собирается только по нажатию кнопки (в отдельном потоке)
+    # и кэшируется по версии данных и состоянию фильтров
+    filter_state = (rating_filter, price_filter, days_filter, tuple(action_filter), sales_filter,
+                    stock_filter, reviews_filter, ad_filter, abc_metric)
+    export_format = st.radio("Формат выгрузки", options=list(EXPORT_FORMATS),
+                             format_func=lambda fmt: EXPORT_FORMATS[fmt][0], horizontal=True)
+    label, _, extension, mime = EXPORT_FORMATS[export_format]
 
     st.download_button(
-        label="Скачать Excel",
-        data=excel_data,
-        file_name="filtered_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        label=f"Скачать {label}",
+        data=partial(export_file, export_format, st.session_state.data_version, filter_state, filtered_df),
+        file_name=f"filtered_data.{extension}",
+        mime=mime
     )
 
 # Страница "Графики"
 elif st.session_state.page == 'graphs':
     st.title("Графики")
-    df = pd.DataFrame(st.session_state.data)
     colA, colB = st.columns(2)
-    with colA:
-        st.subheader("Динамика суммарных продаж за 30 дней")
-        fig_sales = plot_total_daily_sales(df)
-        st.plotly_chart(fig_sales, use_container_width=True)
-        message_sales = """Всплеск продаж в начале месяца может быть напрямую связан с подготовкой 8 марта. 
-                            Обычно наблюдается повышенный спрос на подарки и сопутствующие товары. 
-                            После, как правило, наблюдается спад продаж, из снижения спроса
-                            и покупательской способности, что и отражается в падении графика продаж к середине и концу месяца.
-                        """
-        st.write(message_sales)
-
-        st.subheader("Анализ корреляции между ценой и продажами")
-        fig_price = plot_price_vs_sales(df)
-        st.plotly_chart(fig_price, use_container_width=True)
-        message_correlation = """
-            Нет ярко выраженной линейной корреляции. Точки распределены достаточно хаотично,
-            хотя и прослеживается тенденция, что самые большие объёмы продаж в среднем ценовом диапазоне. 
-                """
-        st.write(message_correlation)
-
-        st.subheader("Кластеризация товаров по количеству отзывов")
-        fig_reviews = plot_reviews_segments(df, low_threshold=100)  # можно изменить порог, если нужно
-        st.plotly_chart(fig_reviews, use_container_width=True)
-
-        message_reviews = """ Значительная часть ассортимента уже успела набрать существенное количество отзывов,
-          что повышает доверие покупателей и облегчает принятие решения о покупке. Тем не менее, почти половина товаров
-            (около 44%) имеет ограниченное количество отзывов, и им может потребоваться дополнительная реклама или стимулирование 
-            оставления отзывов.
-            """
-        st.write(message_reviews)
-
-        st.subheader("Акции & Продажи")
-        fig_sales_action = plot_sales_action_heatmap(df)
-        st.plotly_chart(fig_sales_action, use_container_width=True)
-
-        st.subheader("Количество фото в карточке товара")
-        fig_photos = plot_photos_distribution(df, nbins=20)  # можно настроить число интервалов
-        st.plotly_chart(fig_photos, use_container_width=True)
-
-    with colB:
-        st.subheader("ABC анализ")
-        fig = plot_abc_classic(df)
-        st.plotly_chart(fig, use_container_width=True)
-        message_abc = """График подтверждает «правило Парето» (20% товаров приносят 80% продаж) 
-                    или близкий к нему принцип. Чем круче поднимается оранжевая кривая кумулятивной 
-                    доли в начале и чем длиннее «хвост» справа, тем сильнее выражена концентрация 
-                    продаж в ограниченном наборе позиций.
-                 """
-        st.write(message_abc)
-
-        st.subheader("Ценовая сегментация")
-        fig_segments = plot_price_segments(df)
-        st.plotly_chart(fig_segments, use_container_width=True)
-        message_segments = """
-             Ассортимент смещён в сторону среднего и высокого ценовых диапазонов. 
-             Это может говорить о том, что компания делает ставку на более дорогие 
-             товары либо ориентируется на аудиторию, готовую тратить больше.
-        """
-        st.write(message_segments)
-
-        st.subheader("Кластеризация товаров по рейтингу")
-        fig_ratings = plot_ratings_distribution(df)
-        st.plotly_chart(fig_ratings, use_container_width=True)
-        message_reviews_rating = """
-        Основная масса товаров сосредоточена в диапазоне 4–5 звёзд. 
-        Это говорит о том, что большая часть ассортимента получает высокие оценки покупателей, 
-        что в целом свидетельствует о хорошем качестве товаров или удовлетворённости клиентов.
-            """
-        st.write(message_reviews_rating)
+    for section in GRAPH_SECTIONS:
+        with (colA if section.column == 0 else colB):
+            render_graph_section(section)
 
-        st.subheader("Участие в акции")
-        fig_action = plot_action_distribution(df)
-        st.plotly_chart(fig_action, use_container_width=True)
+# Страница диагностики
+elif st.session_state.page == 'diagnostics':
+    render_diagnostics()
 
-        st.subheader("Дней на маркетплейсе")
-        fig_colors = plot_marketplace_days_distribution(df, nbins=50)
-        st.plotly_chart(fig_colors, use_container_width=True)
+observe('page_render_seconds', time.perf_counter() - render_started, page=st.session_state.page)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Сколько ответов держим в памяти по умолчанию
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Результат разбора body; живёт только в памяти, чтобы не валидировать ответ повторно
+    parsed: Any = None
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Кэш сырых HTTP-ответов: LRU в памяти и, при заданном disk_dir, копия на диске.
+    Запись на диске состоит из строки JSON с метаданными и тела ответа.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f'{name}.cache')
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as file:
+                meta = json.loads(file.readline())
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(body=body, **meta)
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        meta = {
+            'stored_at': entry.stored_at,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+        }
+        path = self._disk_path(key)
+        # Пишем во временный файл и подменяем, чтобы читатель не увидел половину записи
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(json.dumps(meta).encode('utf-8') + b'\n')
+            file.write(entry.body)
+        os.replace(tmp_path, path)
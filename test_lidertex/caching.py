@@ -0,0 +1,90 @@
+import streamlit as st
+
+from export import export_bytes
+from metrics import serve_metrics
+from parser import Parser
+from refresher import Refresher
+from snapshots import SnapshotStore
+
+# Время жизни кэшей, в секундах
+COMPANY_INFO_TTL = 15 * 60
+FIGURE_TTL = 60 * 60
+EXPORT_TTL = 10 * 60
+# Сколько записей держит каждый кэш; старые вытесняются
+MAX_ENTRIES = 32
+
+
+# Один парсер (и его пул соединений) на весь процесс: переживает перезапуски скрипта
+@st.cache_resource
+def get_parser():
+    return Parser()
+
+
+@st.cache_resource
+def get_store():
+    return SnapshotStore()
+
+
+# Фоновое обновление данных одно на процесс: все сессии читают его последнюю версию
+@st.cache_resource
+def get_refresher():
+    return Refresher(get_parser(), get_store()).start()
+
+
+# Эндпоинт /metrics поднимается один раз на процесс, если задан LIDERTEX_METRICS_PORT
+@st.cache_resource
+def get_metrics_server():
+    return serve_metrics()
+
+
+@st.cache_data(ttl=COMPANY_INFO_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def get_legal_info(supplier_id):
+    return get_parser().get_legal_info()
+
+
+@st.cache_data(ttl=COMPANY_INFO_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def get_seller_info(supplier_id):
+    return get_parser().get_seller_info()
+
+
+@st.cache_data(ttl=COMPANY_INFO_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def get_votes(brand_id):
+    return get_parser().get_votes()
+
+
+@st.cache_data(ttl=FIGURE_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def _cached_figure(name, data_version, _plot, _data, params):
+    return _plot(*_data, **params)
+
+
+def cached_figure(plot, data_version, *data, **params):
+    """
+    Фигура plot(*data, **params) из кэша.
+
+    data (DataFrame, матрицы рядов) не хэшируется — её содержимое описывает
+    data_version; ключ кэша — имя функции, версия данных и params.
+    """
+    return _cached_figure(f'{plot.__module__}.{plot.__name__}', data_version, plot, data, params)
+
+
+# Файлы выгрузки крупные, поэтому держим их немного
+@st.cache_data(ttl=EXPORT_TTL, max_entries=8, show_spinner=False)
+def export_file(fmt, data_version, filter_state, _frame):
+    """
+    Файл выгрузки отфильтрованной таблицы _frame в формате fmt.
+    Таблица не хэшируется: её описывают версия данных и состояние фильтров.
+    """
+    return export_bytes(_frame, fmt)
+
+
+def invalidate():
+    """
+    Сбрасывает кэши ответов, информации о компании и графиков (кнопка "Обновить данные").
+    Сами данные обновляет фоновый поток, см. Refresher.request_refresh.
+    """
+    get_parser().cache.clear()
+    get_legal_info.clear()
+    get_seller_info.clear()
+    get_votes.clear()
+    _cached_figure.clear()
+    export_file.clear()
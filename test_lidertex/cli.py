@@ -0,0 +1,232 @@
+"""
+Пакетный обход без Streamlit: товары бренда -> объединение с локальными данными ->
+информация о компании, для одного или нескольких брендов.
+
+Товары пишутся постранично, по мере загрузки каталога, в JSONL или Parquet,
+поэтому память не зависит от размера каталога. С --cards к каждой странице
+добавляются остатки по складам и цены по размерам из карточек (см. enrichment). Код выхода 0 — всё собрано,
+1 — часть данных не получена (файлы с тем, что успели собрать, остаются), 2 — ошибка аргументов.
+
+Запуск:
+    lidertex [--target 310641905:4112047 ...] [--format jsonl|parquet] [--output-dir .]
+             [--concurrency 8] [--mode fast] [--rate 10] [--local-data путь] [--no-company]
+             [--cards] [--card-batch-size 50]
+или
+    python -m test_lidertex ...
+    python test_lidertex/cli.py ...
+"""
+import argparse
+import json
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from enrichment import CARD_BATCH_SIZE, CARD_SCHEMA, enrich_products, fetch_cards
+from frames import COMBINED_COLUMNS
+from headers import BRAND_ID, SUPPLIER_ID
+from local_cache import load_local_table
+from parser import CATALOG_CONCURRENCY, LOCAL_DATA_PATH, VALIDATION_MODES, combine_products
+from scheduler import DEFAULT_RATE, CrawlScheduler, CrawlTarget
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+
+# Типы объединённых столбцов (frames.COMBINED_COLUMNS) в Parquet. Схема задаётся заранее,
+# а не выводится из первой страницы: в ней могут оказаться только пустые значения поля
+COLUMN_TYPES = {
+    'Название': pa.string(),
+    'Рейтинг': pa.float64(),
+    'Количество отзывов': pa.int64(),
+    'Акция': pa.string(),
+    'Цена (руб)': pa.float64(),
+    'Общий остаток': pa.int64(),
+    'Количество цветов': pa.int64(),
+    'Количество фото': pa.int64(),
+    'WB': pa.string(),
+    'ID': pa.int64(),
+    'SKU': pa.int64(),
+    'Выручка, ₽': pa.float64(),
+    'Упущенная выручка, ₽': pa.float64(),
+    'Продажи, кол-во': pa.int64(),
+    'График продаж': pa.string(),
+    'Оборачиваемость, дн.': pa.float64(),
+    'График остатков': pa.string(),
+    'Скидка': pa.float64(),
+    'График изменения цены': pa.string(),
+    'Дробный рейтинг': pa.float64(),
+    'Ср. рейтинг последних отзывов': pa.float64(),
+    'Дней на маркетплейсе': pa.int64(),
+    'Средняя рекламная ставка, ₽': pa.float64(),
+}
+COMBINED_SCHEMA = pa.schema([(name, COLUMN_TYPES[name]) for name in COMBINED_COLUMNS])
+
+
+def output_schema(cards):
+    """Схема строк выгрузки: объединённые столбцы и, с --cards, поля карточек."""
+    return pa.unify_schemas([COMBINED_SCHEMA, CARD_SCHEMA]) if cards else COMBINED_SCHEMA
+
+
+class JsonlOutput:
+    """Строки в JSON Lines: одна запись на строку, пишется сразу."""
+
+    extension = 'jsonl'
+
+    def __init__(self, path, schema):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetOutput:
+    """
+    Parquet со схемой schema: каждая страница каталога — группа строк.
+    Файл создаётся сразу, поэтому и без строк остаётся пустая таблица с этой схемой.
+    """
+
+    extension = 'parquet'
+
+    def __init__(self, path, schema):
+        self.writer = pq.ParquetWriter(path, schema)
+
+    def write(self, rows):
+        if rows:
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.writer.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+OUTPUTS = {output.extension: output for output in (JsonlOutput, ParquetOutput)}
+
+
+def parse_target(value):
+    """BRAND[:SUPPLIER] -> CrawlTarget."""
+    brand_id, _, supplier_id = value.partition(':')
+    if not brand_id.isdigit() or (supplier_id and not supplier_id.isdigit()):
+        raise argparse.ArgumentTypeError(f"ожидается BRAND[:SUPPLIER] из цифр, получено {value!r}")
+    return CrawlTarget(brand_id, supplier_id or None)
+
+
+def positive_int(value):
+    """Целое не меньше 1 (размер пачки, число потоков)."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"ожидается целое не меньше 1, получено {value!r}")
+    return number
+
+
+def crawl_products(parser, local_table, output, concurrency, mode, card_batch_size=None):
+    """
+    Пишет объединённые товары в output по страницам; возвращает (страниц, строк).
+    С card_batch_size строки страницы дополняются полями карточек.
+    """
+    pages = rows = 0
+    for records in parser.iter_records(concurrency, mode):
+        combined = combine_products(records, local_table)
+        if card_batch_size is not None:
+            cards = fetch_cards(parser, [row['ID'] for row in combined], card_batch_size)
+            combined = enrich_products(combined, cards)
+        output.write(combined)
+        pages += 1
+        rows += len(combined)
+    return pages, rows
+
+
+def crawl_company(parser, target):
+    """Информация о компании: {источник: данные} и {источник: ошибка}."""
+    sources = {'votes': parser.get_votes}
+    if target.supplier_id:
+        sources['seller_info'] = parser.get_seller_info
+        sources['legal_info'] = parser.get_legal_info
+
+    company, errors = {}, {}
+    for name, fetch in sources.items():
+        try:
+            company[name] = fetch()
+        except Exception as e:
+            company[name] = None
+            errors[name] = str(e)
+    return company, errors
+
+
+def run_target(scheduler, target, local_table, args):
+    """Обходит один бренд; возвращает словарь ошибок по источникам (пустой — всё собрано)."""
+    parser = scheduler.parser_for(target)
+    errors = {}
+
+    output_class = OUTPUTS[args.format]
+    path = os.path.join(args.output_dir, f'{target.brand_id}.{output_class.extension}')
+    output = output_class(path, output_schema(args.cards))
+    pages = rows = 0
+    try:
+        pages, rows = crawl_products(parser, local_table, output, args.concurrency, args.mode,
+                                     args.card_batch_size if args.cards else None)
+    except Exception as e:
+        errors['products'] = str(e)
+    finally:
+        output.close()
+    print(f'{target.brand_id}: страниц {pages}, товаров {rows} -> {path}', file=sys.stderr)
+
+    if not args.no_company:
+        company, company_errors = crawl_company(parser, target)
+        errors.update(company_errors)
+        company_path = os.path.join(args.output_dir, f'{target.brand_id}.company.json')
+        with open(company_path, 'w', encoding='utf-8') as file:
+            json.dump({'brand_id': target.brand_id, 'supplier_id': target.supplier_id, **company},
+                      file, ensure_ascii=False, indent=2)
+
+    for name, error in errors.items():
+        print(f'{target.brand_id}: не удалось получить {name}: {error}', file=sys.stderr)
+    return errors
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='lidertex', description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--target', action='append', type=parse_target,
+                            help=f'бренд и продавец BRAND[:SUPPLIER], можно несколько '
+                                 f'(по умолчанию {BRAND_ID}:{SUPPLIER_ID})')
+    arg_parser.add_argument('--format', choices=sorted(OUTPUTS), default='jsonl')
+    arg_parser.add_argument('--output-dir', default='.', help='каталог для файлов <бренд>.<формат>')
+    arg_parser.add_argument('--concurrency', type=positive_int, default=CATALOG_CONCURRENCY,
+                            help='сколько страниц каталога загружать одновременно')
+    arg_parser.add_argument('--mode', choices=VALIDATION_MODES, default='fast', help='режим валидации каталога')
+    arg_parser.add_argument('--local-data', default=LOCAL_DATA_PATH, help='JSON локальных данных по SKU')
+    arg_parser.add_argument('--no-company', action='store_true', help='не запрашивать информацию о компании')
+    arg_parser.add_argument('--cards', action='store_true',
+                            help='дополнить товары остатками по складам и ценами по размерам из карточек')
+    arg_parser.add_argument('--card-batch-size', type=positive_int, default=CARD_BATCH_SIZE,
+                            help='сколько товаров запрашивать одной карточкой')
+    arg_parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='общий лимит запросов в секунду')
+    arg_parser.add_argument('--api-root', help='адрес подменного сервера (см. standin)')
+    args = arg_parser.parse_args(argv)
+
+    targets = args.target or [CrawlTarget(str(BRAND_ID), str(SUPPLIER_ID))]
+    os.makedirs(args.output_dir, exist_ok=True)
+    local_table = load_local_table(args.local_data)
+    # Сессия, кэш и ограничитель общие для всех брендов, как в CrawlScheduler.run
+    scheduler = CrawlScheduler(targets, rate=args.rate, api_root=args.api_root)
+
+    failed = False
+    try:
+        for target in targets:
+            if run_target(scheduler, target, local_table, args):
+                failed = True
+    finally:
+        scheduler.session.close()
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
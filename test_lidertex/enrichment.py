@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+
+from headers import card_params
+from metrics import timer
+from models import CardPayload
+from resilience import ParserError
+
+CARD_URL = 'https://card.wb.ru/cards/v2/detail'
+# Сколько товаров запрашиваем одной карточкой (nm=id1;id2;...)
+CARD_BATCH_SIZE = 50
+# Сколько пачек загружаем одновременно; общий темп по-прежнему держат limiter/resilience сессии
+CARD_CONCURRENCY = 4
+
+# Поля карточки, которые добавляются к товару (см. Card.extract_data), и их типы в Parquet.
+# Остатки и цены — списки записей, а не строки JSON: их можно читать и фильтровать
+# средствами Parquet/pandas. У товара без карточки все поля пустые (None), а не нули.
+CARD_SCHEMA = pa.schema([
+    pa.field('Складов с остатком', pa.int64()),
+    pa.field('Остатки по складам', pa.list_(pa.struct([('Склад', pa.int64()), ('Остаток', pa.int64())]))),
+    pa.field('Цены по размерам', pa.list_(pa.struct([('Размер', pa.string()), ('Цена (руб)', pa.float64())]))),
+    pa.field('Мин. цена размера (руб)', pa.float64()),
+    pa.field('Макс. цена размера (руб)', pa.float64()),
+])
+CARD_FIELDS = CARD_SCHEMA.names
+
+
+def batches(ids, size=CARD_BATCH_SIZE):
+    """Номера товаров пачками по size штук без повторов, в исходном порядке."""
+    ids = list(dict.fromkeys(ids))
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
+def fetch_card_batch(parser, ids):
+    """Карточки одной пачки товаров одним запросом: {ID: поля карточки}."""
+    response = parser.session.get(
+        CARD_URL,
+        params={**card_params, 'nm': ';'.join(str(product_id) for product_id in ids)},
+        headers=parser.product_headers,
+    )
+    if response.status_code != 200:
+        raise ParserError(f"Карточки ({len(ids)} шт.): ошибка {response.status_code}: {response.text}",
+                          response.status_code)
+
+    with timer('validation_seconds', model='CardPayload'):
+        payload = CardPayload.model_validate_json(response.content)
+    cards = {}
+    for card in payload.data.products:
+        data = card.extract_data()
+        cards[data['ID']] = data
+    return cards
+
+
+def fetch_cards(parser, ids, batch_size=CARD_BATCH_SIZE, concurrency=CARD_CONCURRENCY):
+    """
+    Карточки товаров ids: {ID: поля карточки}.
+
+    Номера группируются в пачки по batch_size, пачки загружаются параллельно
+    через сессию парсера (её ограничитель и повторы общие с остальными запросами).
+    Ошибка любой пачки поднимает ParserError. Товаров, которых API не вернул, в результате нет.
+    """
+    groups = batches(ids, batch_size)
+    cards = {}
+    if not groups:
+        return cards
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(groups)))) as executor:
+        for batch_cards in executor.map(lambda group: fetch_card_batch(parser, group), groups):
+            cards.update(batch_cards)
+    return cards
+
+
+def enrich_products(products, cards):
+    """Товары (dict из get_products или объединённые строки) с полями CARD_FIELDS; без карточки — None."""
+    enriched = []
+    for product in products:
+        card = cards.get(product['ID'], {})
+        enriched.append({**product, **{name: card.get(name) for name in CARD_FIELDS}})
+    return enriched
@@ -0,0 +1,63 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+# Сколько строк сериализуется за один шаг: промежуточные объекты (строки CSV, таблицы Arrow,
+# кортежи строк) занимают память по размеру куска. Готовый файл целиком лежит в памяти —
+# st.download_button всё равно передаёт содержимое целиком, см. export_bytes
+CHUNK_ROWS = 10_000
+
+SHEET_NAME = 'FilteredData'
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_excel(df, out, chunk_rows=CHUNK_ROWS):
+    """
+    Excel в режиме write_only: openpyxl не держит в памяти объектную модель
+    всех ячеек, строки сразу пишутся в поток листа.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(SHEET_NAME)
+    sheet.append([str(column) for column in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        # astype(object) переводит значения NumPy и категории в обычные объекты Python
+        for row in chunk.astype(object).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(out)
+
+
+def write_csv(df, out, chunk_rows=CHUNK_ROWS):
+    """CSV по кускам; BOM в начале, чтобы Excel открывал кириллицу без настройки кодировки."""
+    out.write('\ufeff'.encode('utf-8'))
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        out.write(chunk.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+
+
+def write_parquet(df, out, chunk_rows=CHUNK_ROWS):
+    """Parquet по кускам: каждый кусок становится отдельной группой строк."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# Формат -> (подпись, функция записи, расширение файла, MIME-тип)
+EXPORT_FORMATS = {
+    'xlsx': ("Excel", write_excel, 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ("CSV", write_csv, 'csv', 'text/csv'),
+    'parquet': ("Parquet", write_parquet, 'parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def export_bytes(df, fmt):
+    """Содержимое файла выгрузки df в формате fmt из EXPORT_FORMATS (собирается в памяти целиком)."""
+    _, write, _, _ = EXPORT_FORMATS[fmt]
+    out = io.BytesIO()
+    write(df, out)
+    return out.getvalue()
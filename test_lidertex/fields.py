@@ -0,0 +1,23 @@
+# Поля товара каталога: короткий идентификатор -> подпись в таблице, на графиках и в выгрузках.
+# Внутри (models.ProductRecord, снимок каталога) товар хранится по идентификаторам,
+# подписи подставляются только на краях: в DataFrame (frames.join_frame) и в dict для
+# выгрузок и внешних вызовов (ProductRecord.to_dict). Идентификаторы не меняются,
+# подписи можно переименовывать.
+PRODUCT_FIELDS = {
+    'name': 'Название',
+    'rating': 'Рейтинг',
+    'feedbacks': 'Количество отзывов',
+    'promo': 'Акция',
+    'price': 'Цена (руб)',
+    'stock': 'Общий остаток',
+    'colors': 'Количество цветов',
+    'pics': 'Количество фото',
+    'url': 'WB',
+    'id': 'ID',
+}
+
+NO_PROMO = "Нет акции"
+
+
+def product_url(product_id):
+    return f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx"
@@ -0,0 +1,85 @@
+import atexit
+import json
+import threading
+import zipfile
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Ответы с этими кодами не записываем: 304 без тела, ошибки лимитов и сбои сервера (5xx)
+# не годятся для воспроизведения
+SKIP_STATUSES = (304, 429)
+
+
+def should_record(status):
+    return status not in SKIP_STATUSES and status < 500
+
+
+def request_key(method, url, params=None, data=None):
+    """
+    Ключ запроса для архива: метод, хост, путь, отсортированные параметры
+    строки запроса и тела формы. Одинаков для записи в Parser и для запроса,
+    пришедшего в подменный сервер.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + list((params or {}).items())
+    key = f'{method.upper()} {parts.hostname}{parts.path}'
+    if query:
+        key += '?' + urlencode(sorted((str(k), str(v)) for k, v in query))
+    if data:
+        form = data.items() if isinstance(data, dict) else parse_qsl(data, keep_blank_values=True)
+        key += ' ' + urlencode(sorted((str(k), str(v)) for k, v in form))
+    return key
+
+
+class FixtureRecorder:
+    """
+    Записывает ответы API в zip-архив: на каждый ответ пара файлов
+    NNNNNN.json (ключ запроса, код, Content-Type) и NNNNNN.body (тело).
+    Потокобезопасен: страницы каталога приходят из нескольких потоков.
+
+    Архив открыт всё время работы записи; оглавление zip дописывается в close
+    (его вызывает HttpSession.close, а на выходе из процесса — atexit).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._archive = zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_DEFLATED)
+        self._count = len(self._archive.namelist()) // 2
+        atexit.register(self.close)
+
+    def record(self, method, url, params, data, response):
+        if not should_record(response.status_code):
+            return
+        meta = {
+            'key': request_key(method, url, params, data),
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', 'application/json'),
+        }
+        with self._lock:
+            if self._archive is None:
+                return
+            name = f'{self._count:06d}'
+            self._archive.writestr(f'{name}.json', json.dumps(meta, ensure_ascii=False))
+            self._archive.writestr(f'{name}.body', response.content)
+            self._count += 1
+
+    def close(self):
+        """Дописывает оглавление и закрывает архив; повторный вызов ничего не делает."""
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+        atexit.unregister(self.close)
+
+
+def load_fixtures(path):
+    """Архив FixtureRecorder в виде {ключ запроса: (код, Content-Type, тело)}; более поздние записи побеждают."""
+    fixtures = {}
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if not name.endswith('.json'):
+                continue
+            meta = json.loads(archive.read(name))
+            body = archive.read(name[:-len('.json')] + '.body')
+            fixtures[meta['key']] = (meta['status'], meta['content_type'], body)
+    return fixtures
@@ -0,0 +1,105 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from fields import PRODUCT_FIELDS, product_url
+from metrics import timed
+
+# Поля товара из каталога (подписи fields.PRODUCT_FIELDS), попадающие в объединённую таблицу
+PRODUCT_COLUMNS = list(PRODUCT_FIELDS.values())
+
+# Поля из локальных данных
+LOCAL_COLUMNS = [
+    'SKU', 'Выручка, ₽', 'Упущенная выручка, ₽', 'Продажи, кол-во', 'График продаж',
+    'Оборачиваемость, дн.', 'График остатков', 'Скидка', 'График изменения цены',
+    'Дробный рейтинг', 'Ср. рейтинг последних отзывов', 'Дней на маркетплейсе',
+    'Средняя рекламная ставка, ₽',
+]
+
+COMBINED_COLUMNS = PRODUCT_COLUMNS + LOCAL_COLUMNS
+
+# Столбцы, которые храним категориями: значений мало, строк много
+CATEGORICAL_COLUMNS = ['Акция']
+
+
+def typed_column(values):
+    """Столбец как массив NumPy; строки NumPy (<U) переводятся в object, как принято в pandas."""
+    values = np.asarray(values)
+    if values.dtype.kind == 'U':
+        return values.astype(object)
+    return values
+
+
+@timed('join_seconds')
+def join_frame(products, local_table):
+    """
+    Колоночное объединение товаров каталога с локальными данными.
+
+    products — список models.ProductRecord (порядок выдачи каталога),
+    local_table — local_cache.LocalTable. Товары без строки в локальных данных
+    отбрасываются, как в Parser.get_combined_data. Поля записей переходят в
+    столбцы по одному (struct-of-arrays) и только здесь получают подписи.
+    Возвращает типизированный DataFrame со столбцами COMBINED_COLUMNS.
+    """
+    positions = local_table.lookup([product.id for product in products])
+    matched = np.flatnonzero(positions >= 0)
+    positions = positions[matched]
+    products = [products[i] for i in matched]
+
+    columns = {}
+    for field, name in PRODUCT_FIELDS.items():
+        if field == 'url':
+            # Ссылка в записи не хранится, строится из id
+            columns[name] = typed_column([product_url(product.id) for product in products])
+        else:
+            columns[name] = typed_column([getattr(product, field) for product in products])
+    for name in LOCAL_COLUMNS:
+        columns[name] = typed_column(local_table.columns[name][positions])
+
+    return compact_frame(pd.DataFrame(columns, columns=COMBINED_COLUMNS))
+
+
+def compact_frame(frame):
+    """Ужимает целые столбцы и переводит CATEGORICAL_COLUMNS в категории."""
+    for name in frame.columns:
+        if frame[name].dtype.kind in 'iu':
+            frame[name] = pd.to_numeric(frame[name], downcast='integer')
+        elif name in CATEGORICAL_COLUMNS:
+            frame[name] = frame[name].astype('category')
+    return frame
+
+
+def read_only_array(column):
+    """Копия значений столбца, которую нельзя изменить на месте: массив NumPy или категории."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy(copy=True)
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=column.dtype)
+    if isinstance(column.dtype, np.dtype):
+        values = column.to_numpy(copy=True)
+        values.flags.writeable = False
+        return values
+    # Прочие типы расширений pandas флага записи не имеют — остаётся копия
+    return column.array.copy()
+
+
+def read_only_frame(frame):
+    """
+    Копия frame, значения которой нельзя изменить на месте: присваивание через
+    loc/iloc и операции вида df['x'] += 1 поднимают ValueError. Производные
+    таблицы (фильтры, join, copy()) снова изменяемые. Структуру (добавление
+    и удаление столбцов) флаг записи не защищает — её меняют только на копии.
+    """
+    return pd.DataFrame(
+        {name: pd.Series(read_only_array(frame[name]), index=frame.index, name=name)
+         for name in frame.columns},
+        columns=frame.columns,
+        copy=False,
+    )
+
+
+def data_version(df):
+    """Отпечаток содержимого DataFrame: меняется, если изменилась любая ячейка или порядок строк."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
@@ -1,25 +1,78 @@
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
-def plot_total_daily_sales(df):
+from metrics import timed
+from series import parse_series
+
+# Графики ниже строятся по заранее посчитанным количествам (границы корзин и счётчики),
+# а не по строкам товаров: размер фигуры не зависит от размера каталога
+
+def histogram_figure(values, nbins, title, x_label):
+    """
+    Гистограмма по np.histogram: в Plotly уходят только центры корзин и количества,
+    границы корзин показываются при наведении.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=f"{x_label}: %{{customdata[0]:.4g}}–%{{customdata[1]:.4g}}<br>"
+                      "Количество товаров: %{y}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title="Количество товаров",
+        template="plotly_dark",
+        bargap=0.2
+    )
+    return fig
+
+def count_labels(labels, names_column):
+    """Количество товаров по меткам (как value_counts) в виде маленького DataFrame для px.pie."""
+    counts = pd.Series(labels).value_counts()
+    return pd.DataFrame({names_column: counts.index, "Количество товаров": counts.to_numpy()})
+
+def action_labels(actions):
+    """
+    Метки "С акцией"/"Без акции": товар участвует в акции, если в поле 'Акция'
+    непустая строка, отличная от "нет акции" (без учёта регистра и пробелов).
+    Метка считается один раз на каждое уникальное значение, а не на каждую строку.
+    """
+    categorical = pd.Categorical(actions)
+    categories = categorical.categories.to_numpy(dtype=object)
+    on_action = np.array([
+        isinstance(value, str) and value.strip().lower() not in ("", "нет акции")
+        for value in categories
+    ], dtype=bool)
+    codes = categorical.codes
+    # Код -1 — пропущенное значение, такой товар без акции
+    result = np.zeros(len(codes), dtype=bool)
+    present = codes >= 0
+    result[present] = on_action[codes[present]]
+    return np.where(result, "С акцией", "Без акции")
+
+@timed('graph_seconds')
+def plot_total_daily_sales(df, sales=None):
     """
     Построение интерактивного графика суммарных продаж за 30 дней.
     
     Ожидается, что в DataFrame имеется столбец "График продаж",
     содержащий строку с 30 числами (продажи по дням месяца), разделёнными запятыми.
     Функция суммирует продажи по каждому дню для всех товаров и строит интерактивный график.
+
+    Параметры:
+      sales (SeriesMatrix): уже разобранный столбец "График продаж", выровненный с df.
+                            Если не передан, столбец разбирается здесь же.
     """
-    total_sales = [0] * 30
-    for sales_str in df['График продаж']:
-        try:
-            sales_list = [float(x.strip()) for x in sales_str.split(',')]
-        except Exception:
-            continue
-        if len(sales_list) != 30:
-            continue
-        for i, sale in enumerate(sales_list):
-            total_sales[i] += sale
+    if sales is None:
+        sales = parse_series(df['График продаж'])
+    total_sales = sales.total()
 
     days = list(range(1, 31))
     data = pd.DataFrame({'День': days, 'Общие продажи': total_sales})
@@ -37,6 +90,7 @@ def plot_total_daily_sales(df):
     )
     return fig
 
+@timed('graph_seconds')
 def plot_abc_pie_chart(df):
     """
     Функция разбивает товары по продажам на три группы ABC:
@@ -46,25 +100,12 @@ def plot_abc_pie_chart(df):
     Затем функция строит интерактивную круговую диаграмму с количеством товаров в каждой группе.
     """
     # Вычисляем процентильные пороги для продаж
-    q33 = df['Продажи, кол-во'].quantile(0.33)
-    q66 = df['Продажи, кол-во'].quantile(0.66)
-    
-    # Функция для назначения группы по продажам
-    def assign_group(sales):
-        if sales > q66:
-            return 'A'
-        elif sales >= q33:
-            return 'B'
-        else:
-            return 'C'
+    sales = df['Продажи, кол-во'].to_numpy()
+    q33, q66 = np.quantile(sales, [0.33, 0.66])
     
-    # Применяем функцию к столбцу продаж и получаем группу для каждого товара
-    df = df.copy()  # чтобы не изменять исходный DataFrame
-    df['ABC_Group'] = df['Продажи, кол-во'].apply(assign_group)
-    
-    # Подсчитываем количество товаров в каждой группе
-    group_counts = df['ABC_Group'].value_counts().reset_index()
-    group_counts.columns = ['Группа', 'Количество товаров']
+    # Группа для каждого товара
+    groups = np.select([sales > q66, sales >= q33], ['A', 'B'], default='C')
+    group_counts = count_labels(groups, 'Группа')
     
     # Строим интерактивный пирог
     fig = px.pie(
@@ -78,6 +119,7 @@ def plot_abc_pie_chart(df):
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+@timed('graph_seconds')
 def plot_price_vs_sales(df):
     """
     Строит интерактивный scatter plot для анализа корреляции между ценой и продажами.
@@ -101,6 +143,7 @@ def plot_price_vs_sales(df):
     fig.update_layout(template="plotly_dark")
     return fig
 
+@timed('graph_seconds')
 def plot_price_segments(df):
     """
     Разбивает товары на три ценовых сегмента (нижний, средний, высокий)
@@ -109,23 +152,12 @@ def plot_price_segments(df):
     Предполагается, что в DataFrame есть столбец 'Цена (руб)'.
     Вы можете при необходимости изменить границы сегментов.
     """
-
     # Определим границы сегментов (пример: <500, 500–1500, >1500)
-    def get_price_segment(price):
-        if price < 500:
-            return "Нижний"
-        elif price <= 1500:
-            return "Средний"
-        else:
-            return "Высокий"
-
-    # Создадим копию, чтобы не менять исходный DataFrame
-    df_copy = df.copy()
-    df_copy["Ценовой сегмент"] = df_copy["Цена (руб)"].apply(get_price_segment)
+    price = df["Цена (руб)"].to_numpy()
+    segments = np.select([price < 500, price <= 1500], ["Нижний", "Средний"], default="Высокий")
 
     # Считаем, сколько товаров в каждом сегменте
-    segment_counts = df_copy["Ценовой сегмент"].value_counts().reset_index()
-    segment_counts.columns = ["Ценовой сегмент", "Количество товаров"]
+    segment_counts = count_labels(segments, "Ценовой сегмент")
 
     # Строим интерактивный пирог
     fig = px.pie(
@@ -137,6 +169,7 @@ def plot_price_segments(df):
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+@timed('graph_seconds')
 def plot_reviews_segments(df, low_threshold=20):
     """
     Разбивает товары на три группы по количеству отзывов:
@@ -153,22 +186,16 @@ def plot_reviews_segments(df, low_threshold=20):
     Возвращает:
       fig (Plotly Figure): Интерактивный график-пирог.
     """
-    # Функция для назначения категории отзывов
-    def assign_reviews_category(num_reviews):
-        if num_reviews == 0:
-            return "Нет отзывов"
-        elif num_reviews <= low_threshold:
-            return "Мало отзывов (< 100)"
-        else:
-            return "Много отзывов(> 100)"
-    
-    # Создаем копию DataFrame, чтобы не изменять исходный
-    df_copy = df.copy()
-    df_copy["Отзывы_категория"] = df_copy["Количество отзывов"].apply(assign_reviews_category)
+    # Категория отзывов для каждого товара
+    reviews = df["Количество отзывов"].to_numpy()
+    categories = np.select(
+        [reviews == 0, reviews <= low_threshold],
+        ["Нет отзывов", "Мало отзывов (< 100)"],
+        default="Много отзывов(> 100)"
+    )
     
     # Подсчитываем количество товаров в каждой категории
-    counts = df_copy["Отзывы_категория"].value_counts().reset_index()
-    counts.columns = ["Отзывы", "Количество товаров"]
+    counts = count_labels(categories, "Отзывы")
     
     # Строим интерактивный пирог
     fig = px.pie(
@@ -186,6 +213,7 @@ def plot_reviews_segments(df, low_threshold=20):
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+@timed('graph_seconds')
 def plot_ratings_distribution(df):
     """
     Строит интерактивную гистограмму распределения товаров по рейтингу.
@@ -196,45 +224,18 @@ def plot_ratings_distribution(df):
     Возвращает:
       fig (Plotly Figure): Интерактивный график распределения рейтингов.
     """
-    # Строим гистограмму; можно задать количество корзин (nbins) для более детального анализа
-    fig = px.histogram(
-        df, 
-        x="Рейтинг", 
-        nbins=20,  
-        title="Распределение товаров по рейтингу",
-        labels={"Рейтинг": "Рейтинг товара", "count": "Количество товаров"},
-        template="plotly_dark"
-    )
-    fig.update_layout(bargap=0.2)
-    return fig
+    # Количество корзин (nbins) можно увеличить для более детального анализа
+    return histogram_figure(df["Рейтинг"], 20, "Распределение товаров по рейтингу", "Рейтинг товара")
 
+@timed('graph_seconds')
 def plot_action_distribution(df):
     """
     Строит круговую диаграмму, показывающую, у скольких товаров есть акция и у скольких нет.
     
     Ожидается, что в DataFrame есть столбец 'Акция'.
     """
-    # Создадим копию, чтобы не изменять исходный DataFrame
-    df_copy = df.copy()
-    
-    # Функция для определения, участвует товар в акции или нет
-    def is_on_action(action_value):
-        # Считаем, что если в поле 'Акция' не пустая строка и не "Нет" (с любым регистром),
-        # то товар участвует в акции.
-        if not isinstance(action_value, str):
-            return "Без акции"
-        # Убираем лишние пробелы и приводим к нижнему регистру
-        val = action_value.strip().lower()
-        if val and val != "нет акции":
-            return "С акцией"
-        else:
-            return "Без акции"
-    
-    df_copy["action_label"] = df_copy["Акция"].apply(is_on_action)
-    
-    # Подсчитываем количество товаров в каждой группе
-    action_counts = df_copy["action_label"].value_counts().reset_index()
-    action_counts.columns = ["Акция", "Количество товаров"]
+    # Подсчитываем количество товаров с акцией и без
+    action_counts = count_labels(action_labels(df["Акция"]), "Акция")
     
     # Строим интерактивную круговую диаграмму
     fig = px.pie(
@@ -251,6 +252,7 @@ def plot_action_distribution(df):
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+@timed('graph_seconds')
 def plot_sales_action_heatmap(df, bin_size=50):
     """
     Строит тепловую карту, показывающую распределение товаров по количеству продаж 
@@ -263,34 +265,23 @@ def plot_sales_action_heatmap(df, bin_size=50):
     Возвращает:
       fig (Plotly Figure): Интерактивная тепловая карта.
     """
-    # Функция для определения, участвует ли товар в акции
-    def is_on_action(action_value):
-        if not isinstance(action_value, str):
-            return "Без акции"
-        val = action_value.strip().lower()
-        if val and val != "нет акции":
-            return "С акцией"
-        else:
-            return "Без акции"
+    # Метка по акции для каждого товара
+    labels = action_labels(df["Акция"])
     
-    df = df.copy()
-    # Добавляем метку по акции, если её ещё нет
-    if "action_label" not in df.columns:
-        df["action_label"] = df["Акция"].apply(is_on_action)
-    
-    # Определяем диапазон продаж
-    min_sales = df["Продажи, кол-во"].min()
-    max_sales = df["Продажи, кол-во"].max()
-    # Создаем интервалы (бины)
+    # Создаем интервалы (бины) продаж: [0, bin_size), [bin_size, 2*bin_size), ...
+    sales = df["Продажи, кол-во"].to_numpy()
+    max_sales = sales.max()
     bins = np.arange(0, max_sales + bin_size, bin_size)
-    labels = [f"{int(b)}-{int(b+bin_size-1)}" for b in bins[:-1]]
-    
-    # Добавляем столбец с интервалами продаж
-    df["sales_bin"] = pd.cut(df["Продажи, кол-во"], bins=bins, labels=labels, right=False)
+    n_bins = len(bins) - 1
+    bin_labels = [f"{int(b)}-{int(b+bin_size-1)}" for b in bins[:-1]]
     
-    # Строим сводную таблицу: строки – наличие акции, столбцы – бин продаж, значения – количество товаров
-    pivot = df.pivot_table(index="action_label", columns="sales_bin", 
-                           values="Название", aggfunc="count", fill_value=0)
+    # Сводная таблица через bincount: строки – наличие акции, столбцы – бин продаж,
+    # значения – количество товаров. Продажи вне интервалов не учитываются
+    row_index, rows = pd.factorize(labels, sort=True)
+    bin_index = np.floor_divide(sales, bin_size).astype(np.int64)
+    inside = (sales >= 0) & (bin_index < n_bins)
+    counts = np.bincount(row_index[inside] * n_bins + bin_index[inside], minlength=len(rows) * n_bins)
+    pivot = pd.DataFrame(counts.reshape(len(rows), n_bins), index=rows, columns=bin_labels)
     
     # Строим интерактивную тепловую карту
     fig = px.imshow(pivot,
@@ -304,6 +295,7 @@ def plot_sales_action_heatmap(df, bin_size=50):
     
     return fig
 
+@timed('graph_seconds')
 def plot_photos_distribution(df, nbins=10):
     """
     Строит интерактивную гистограмму распределения товаров по количеству фотографий в карточке.
@@ -315,17 +307,12 @@ def plot_photos_distribution(df, nbins=10):
     Возвращает:
       fig (Plotly Figure): Интерактивный график распределения.
     """
-    fig = px.histogram(
-        df,
-        x="Количество фото",
-        nbins=nbins,
-        title="Распределение товаров по количеству фотографий",
-        labels={"Количество фото": "Количество фотографий", "count": "Количество товаров"},
-        template="plotly_dark"
+    return histogram_figure(
+        df["Количество фото"], nbins,
+        "Распределение товаров по количеству фотографий", "Количество фотографий"
     )
-    fig.update_layout(bargap=0.2)
-    return fig
 
+@timed('graph_seconds')
 def plot_marketplace_days_distribution(df, nbins=10):
     """
     Строит интерактивную гистограмму распределения товаров по количеству дней на маркетплейсе.
@@ -337,13 +324,7 @@ def plot_marketplace_days_distribution(df, nbins=10):
     Возвращает:
       fig (Plotly Figure): Интерактивный график распределения дней на маркетплейсе.
     """
-    fig = px.histogram(
-        df,
-        x="Дней на маркетплейсе",
-        nbins=nbins,
-        title="Распределение товаров по количеству дней на маркетплейсе",
-        labels={"Дней на маркетплейсе": "Дней на маркетплейсе", "count": "Количество товаров"},
-        template="plotly_dark"
+    return histogram_figure(
+        df["Дней на маркетплейсе"], nbins,
+        "Распределение товаров по количеству дней на маркетплейсе", "Дней на маркетплейсе"
     )
-    fig.update_layout(bargap=0.2)
-    return fig
\ No newline at end of file
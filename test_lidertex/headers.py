@@ -1,3 +1,19 @@
+# Бренд и продавец, которых показывает дашборд по умолчанию
+BRAND_ID = '310641905'
+SUPPLIER_ID = '4112047'
+
+
+def brand_referer(brand_id):
+    # Для основного бренда оставляем адрес страницы со слагом, как в браузере
+    if str(brand_id) == BRAND_ID:
+        return f'https://www.wildberries.ru/brands/{BRAND_ID}-lider-dom'
+    return f'https://www.wildberries.ru/brands/{brand_id}'
+
+
+def seller_referer(supplier_id):
+    return f'https://www.wildberries.ru/seller/{supplier_id}'
+
+
 product_headers = {
     'accept': '*/*',
     'accept-language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
@@ -5,7 +21,7 @@ product_headers = {
     'origin': 'https://www.wildberries.ru',
     'pragma': 'no-cache',
     'priority': 'u=1, i',
-    'referer': 'https://www.wildberries.ru/brands/310641905-lider-dom',
+    'referer': brand_referer(BRAND_ID),
     'sec-ch-ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
     'sec-ch-ua-mobile': '?0',
     'sec-ch-ua-platform': '"Windows"',
@@ -18,7 +34,7 @@ product_headers = {
 product_params = {
     'ab_testing': 'false',
     'appType': '1',
-    'brand': '310641905',
+    'brand': BRAND_ID,
     'curr': 'rub',
     'dest': '-1257786',
     'hide_dtype': '13',
@@ -29,6 +45,14 @@ product_params = {
     'uclusters': '0',
 }
 
+# Параметры запроса карточек; номера товаров (nm) подставляются пачкой через ";"
+card_params = {
+    'appType': '1',
+    'curr': 'rub',
+    'dest': '-1257786',
+    'spp': '30',
+}
+
 vote_headers =  {
     'accept': '*/*',
     'accept-language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
@@ -39,7 +63,7 @@ vote_headers =  {
     'origin': 'https://www.wildberries.ru',
     'pragma': 'no-cache',
     'priority': 'u=1, i',
-    'referer': 'https://www.wildberries.ru/brands/310641905-lider-dom',
+    'referer': brand_referer(BRAND_ID),
     'sec-ch-ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
     'sec-ch-ua-mobile': '?0',
     'sec-ch-ua-platform': '"Windows"',
@@ -52,7 +76,7 @@ vote_headers =  {
 }
 
 vote_data = {
-    'brandId': '310641905',
+    'brandId': BRAND_ID,
 }
 
 seller_info_headers = {
@@ -62,7 +86,7 @@ seller_info_headers = {
     'origin': 'https://www.wildberries.ru',
     'pragma': 'no-cache',
     'priority': 'u=1, i',
-    'referer': 'https://www.wildberries.ru/seller/4112047',
+    'referer': seller_referer(SUPPLIER_ID),
     'sec-ch-ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
     'sec-ch-ua-mobile': '?0',
     'sec-ch-ua-platform': '"Windows"',
@@ -80,7 +104,7 @@ legal_info_headers = {
     'origin': 'https://www.wildberries.ru',
     'pragma': 'no-cache',
     'priority': 'u=1, i',
-    'referer': 'https://www.wildberries.ru/seller/4112047',
+    'referer': seller_referer(SUPPLIER_ID),
     'sec-ch-ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
     'sec-ch-ua-mobile': '?0',
     'sec-ch-ua-platform': '"Windows"',
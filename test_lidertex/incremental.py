@@ -0,0 +1,126 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import List
+
+from fields import PRODUCT_FIELDS
+from frames import join_frame
+from models import ProductRecord
+from parser import CATALOG_CONCURRENCY
+
+
+def fingerprint(content):
+    """Отпечаток тела страницы каталога (bytes): меняется при любом изменении ответа."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+@dataclass
+class ChangeSet:
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    price_changed: List[int] = field(default_factory=list)
+    stock_changed: List[int] = field(default_factory=list)
+    # Товары со страниц, которые пришлось заново валидировать (включая новые)
+    revalidated: List[int] = field(default_factory=list)
+
+    def summary(self):
+        return (
+            f"новых: {len(self.added)}, удалено: {len(self.removed)}, "
+            f"изменилась цена: {len(self.price_changed)}, "
+            f"изменился остаток: {len(self.stock_changed)}"
+        )
+
+
+class CatalogSnapshot:
+    """
+    Снимок каталога между обновлениями.
+
+    При refresh отпечаток считается по байтам каждой страницы каталога, без
+    разбора JSON. Страница с прежним отпечатком берётся из предыдущего снимка
+    целиком; изменившаяся валидируется из байтов (Parser.validate_page, как
+    в режиме fast), и только её товары сравниваются с предыдущими. Стоимость
+    обновления без изменений — хэш тел страниц. Объединение с локальными
+    данными колоночное (frames.join_frame) и выполняется целиком.
+    """
+
+    def __init__(self):
+        # Номер страницы -> (отпечаток тела, товары страницы, total)
+        self.pages = {}
+        # Товары между обновлениями хранятся компактно (models.ProductRecord), а не dict с подписями
+        self.products = {}
+
+    def seed(self, frame):
+        """
+        Берёт товары восстановленного снимка (объединённый DataFrame) за базу
+        для сравнения, чтобы первое обновление после перезапуска не считало весь
+        каталог новым. Отпечатков страниц у снимка нет, поэтому первое обновление
+        всё равно валидирует каждую страницу, но изменения считает относительно снимка.
+        В снимке только товары, найденные в локальных данных; остальные
+        при первом обновлении попадут в новые.
+        """
+        columns = {field: frame[label].tolist() for field, label in PRODUCT_FIELDS.items() if field != 'url'}
+        products = {}
+        occurrences = {}
+        for values in zip(*columns.values()):
+            record = ProductRecord(**dict(zip(columns, values)))
+            key = (record.id, occurrences.get(record.id, 0))
+            occurrences[record.id] = key[1] + 1
+            products[key] = record
+        self.pages = {}
+        self.products = products
+
+    def fetch_page(self, parser, page, pages):
+        """
+        Страница каталога для refresh: {'products': [ProductRecord], 'total': ...,
+        'revalidated': bool} или None. Результат запоминается в pages.
+        """
+        content = parser.fetch_page_content(page)
+        digest = fingerprint(content)
+        previous = self.pages.get(page)
+        if previous is not None and previous[0] == digest:
+            pages[page] = previous
+            return {'products': previous[1], 'total': previous[2], 'revalidated': False}
+
+        data = parser.validate_page(content)
+        if data is None:
+            return None
+        records = [product.extract_record() for product in data.products]
+        pages[page] = (digest, records, data.total)
+        return {'products': records, 'total': data.total, 'revalidated': True}
+
+    def refresh(self, parser, concurrency=CATALOG_CONCURRENCY):
+        """Обновляет снимок и возвращает (объединённый DataFrame, ChangeSet)."""
+        pages = {}
+        catalog = parser.get_raw_pages(concurrency, fetch=lambda page: self.fetch_page(parser, page, pages))
+
+        changes = ChangeSet()
+        products = {}
+        # Ключ товара — (id, номер повтора): каталог изредка отдаёт один id дважды
+        occurrences = {}
+        for page in catalog:
+            for product in page['products']:
+                product_id = product.id
+                key = (product_id, occurrences.get(product_id, 0))
+                occurrences[product_id] = key[1] + 1
+                products[key] = product
+
+                previous = self.products.get(key)
+                if previous is product:
+                    # Страница не изменилась и товар на прежнем месте
+                    continue
+                if page['revalidated']:
+                    changes.revalidated.append(product_id)
+                if previous is None:
+                    changes.added.append(product_id)
+                    continue
+                if previous.price != product.price:
+                    changes.price_changed.append(product_id)
+                if previous.stock != product.stock:
+                    changes.stock_changed.append(product_id)
+
+        changes.removed = [key[0] for key in self.products if key not in products]
+
+        self.pages = pages
+        self.products = products
+
+        # products заполнялся в порядке выдачи каталога
+        return join_frame(list(products.values()), parser.get_local_table()), changes
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+
+import numpy as np
+
+# Меняется при изменении формата кэша, чтобы старый кэш пересобрался
+CACHE_FORMAT = 3
+META_FILE = 'meta.json'
+
+
+class LocalTable:
+    """
+    Локальные данные в колоночном виде: по одному массиву NumPy на поле
+    и отсортированный индекс SKU для поиска через searchsorted.
+    Массивы, загруженные из кэша, отображены в память (mmap) и читаются лениво.
+    """
+
+    def __init__(self, columns, index_skus, index_positions):
+        self.columns = columns
+        self.index_skus = index_skus
+        self.index_positions = index_positions
+
+    def __len__(self):
+        return len(self.columns['SKU']) if 'SKU' in self.columns else 0
+
+    def lookup(self, skus):
+        """Позиции строк для массива SKU; -1 там, где SKU нет в данных."""
+        skus = np.asarray(skus, dtype=np.int64)
+        if len(self.index_skus) == 0:
+            return np.full(len(skus), -1, dtype=np.int64)
+        idx = np.searchsorted(self.index_skus, skus)
+        idx = np.minimum(idx, len(self.index_skus) - 1)
+        found = self.index_skus[idx] == skus
+        return np.where(found, self.index_positions[idx], -1)
+
+    def row(self, position):
+        """Строка в том же виде, что и запись исходного JSON."""
+        return {name: column[position].item() for name, column in self.columns.items()}
+
+    def get(self, sku):
+        position = self.lookup([sku])[0]
+        return None if position < 0 else self.row(position)
+
+
+def typed_column(values):
+    """
+    Массив NumPy для значений одного поля (None — пропуск):
+    только bool — bool; целые и bool — int64; с дробными или пропусками — float64,
+    пропуск становится NaN, как в pandas; иначе строки, пропуск — пустая строка.
+    """
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, (int, float)) for v in present):
+        if len(present) == len(values) and all(isinstance(v, bool) for v in present):
+            return np.array(values, dtype=np.bool_)
+        if len(present) == len(values) and all(isinstance(v, int) for v in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return np.array(['' if v is None else str(v) for v in values], dtype=np.str_)
+
+
+def build_table(records):
+    """
+    Собирает LocalTable из списка записей исходного JSON.
+    Столбцы — объединение полей всех записей; поле, которого нет в записи, — пропуск.
+    """
+    names = list(dict.fromkeys(name for record in records for name in record))
+    columns = {name: typed_column([record.get(name) for record in records]) for name in names}
+
+    skus = columns.get('SKU', np.array([], dtype=np.int64))
+    positions = np.arange(len(skus))
+    if skus.dtype.kind == 'f':
+        # Записи без SKU в индекс не попадают
+        present = ~np.isnan(skus)
+        skus, positions = skus[present].astype(np.int64), positions[present]
+    # Стабильная сортировка: среди повторов SKU последняя запись оказывается последней,
+    # её и оставляем — как при сборке словаря {SKU: запись}
+    order = np.argsort(skus, kind='stable')
+    sorted_skus = skus[order]
+    keep = np.ones(len(sorted_skus), dtype=bool)
+    keep[:-1] = sorted_skus[1:] != sorted_skus[:-1]
+    return LocalTable(columns, sorted_skus[keep], positions[order][keep])
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, META_FILE), encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('format') == CACHE_FORMAT else None
+
+
+def _replace_atomically(cache_dir, file_name, write):
+    """
+    Пишет файл во временный файл с уникальным именем в том же каталоге
+    и переименовывает его в file_name одним os.replace: читатель видит
+    либо старый файл целиком, либо новый, а параллельные писатели
+    не делят одно временное имя.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f'.{file_name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            write(file)
+        os.replace(tmp_path, os.path.join(cache_dir, file_name))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_meta(cache_dir, meta):
+    payload = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    _replace_atomically(cache_dir, META_FILE, lambda file: file.write(payload))
+
+
+def _save_table(table, cache_dir, meta):
+    """
+    Массивы каждой сборки получают новые имена (свой префикс версии), поэтому
+    файлы, уже отображённые в память другими сессиями и процессами, никогда
+    не перезаписываются. meta.json переключается на новую сборку последним,
+    после него удаляются файлы прежних сборок (открытые отображения на Linux
+    продолжают работать с удалённым файлом).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    build = uuid.uuid4().hex[:12]
+
+    def save(file_name, array):
+        _replace_atomically(cache_dir, file_name, lambda file: np.save(file, array))
+        return file_name
+
+    meta['columns'] = {
+        name: save(f'{build}_col_{i:02d}.npy', column)
+        for i, (name, column) in enumerate(table.columns.items())
+    }
+    meta['index'] = {
+        'skus': save(f'{build}_index_skus.npy', table.index_skus),
+        'positions': save(f'{build}_index_positions.npy', table.index_positions),
+    }
+    # meta пишем последним: пока он указывает на прежнюю сборку, новая не видна
+    _write_meta(cache_dir, meta)
+    _remove_stale_arrays(cache_dir, meta)
+
+
+def _remove_stale_arrays(cache_dir, meta):
+    current = set(meta['columns'].values()) | set(meta['index'].values())
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith('.npy') and file_name not in current:
+            try:
+                os.remove(os.path.join(cache_dir, file_name))
+            except OSError:
+                # Файл ещё открыт (Windows) или удалён другим процессом — уберём в следующий раз
+                pass
+
+
+def _load_table(cache_dir, meta):
+    def load(file_name):
+        return np.load(os.path.join(cache_dir, file_name), mmap_mode='r')
+
+    columns = {name: load(file_name) for name, file_name in meta['columns'].items()}
+    return LocalTable(columns, load(meta['index']['skus']), load(meta['index']['positions']))
+
+
+def load_local_table(source_path, cache_dir=None):
+    """
+    Возвращает LocalTable для JSON-файла source_path через кэш в cache_dir.
+
+    Кэш считается актуальным, пока у исходного файла не изменились размер и mtime.
+    Если они изменились, сверяем SHA-256: при совпадении только обновляем
+    метаданные, иначе разбираем JSON заново и пересобираем кэш.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(source_path), '.cache')
+    stat = os.stat(source_path)
+    meta = _read_meta(cache_dir)
+
+    # Файлы сборки могли удалить параллельные писатели: тогда собираем кэш заново
+    if meta is not None:
+        if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            try:
+                return _load_table(cache_dir, meta)
+            except OSError:
+                pass
+        source_hash = _file_hash(source_path)
+        if meta['sha256'] == source_hash:
+            try:
+                table = _load_table(cache_dir, meta)
+                meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_meta(cache_dir, meta)
+                return table
+            except OSError:
+                pass
+    else:
+        source_hash = _file_hash(source_path)
+
+    with open(source_path, 'r', encoding='utf-8') as file:
+        table = build_table(json.load(file))
+
+    meta = {
+        'format': CACHE_FORMAT,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': source_hash,
+    }
+    try:
+        _save_table(table, cache_dir, meta)
+        return _load_table(cache_dir, meta)
+    except OSError:
+        # Каталог недоступен для записи (или сборку уже заменил другой писатель) —
+        # работаем с таблицей в памяти
+        return table
@@ -0,0 +1,239 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Префикс имён метрик в формате Prometheus
+PREFIX = 'lidertex_'
+
+# Границы корзин гистограмм длительности, в секундах
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Границы корзин размеров, в байтах
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Метрики, у которых корзины не по времени
+METRIC_BUCKETS = {'http_response_bytes': BYTES_BUCKETS}
+
+# Сколько последних значений каждой серии держим для квантилей на странице диагностики
+RECENT_SIZE = 1024
+
+# JSONL-журнал наблюдений: путь задаётся переменной окружения LIDERTEX_METRICS_LOG
+METRICS_LOG = os.environ.get('LIDERTEX_METRICS_LOG')
+# Строки журнала дописываются пачками: по LOG_BATCH строк или раз в LOG_FLUSH_SECONDS секунд
+LOG_BATCH = 1000
+LOG_FLUSH_SECONDS = 1.0
+# Порт HTTP-эндпоинта /metrics: переменная окружения LIDERTEX_METRICS_PORT
+METRICS_PORT = os.environ.get('LIDERTEX_METRICS_PORT')
+
+# Описания метрик для # HELP
+DESCRIPTIONS = {
+    'http_request_seconds': 'Длительность HTTP-запроса к API (одна попытка)',
+    'http_response_bytes': 'Размер тела ответа API в байтах',
+    'validation_seconds': 'Время валидации ответа pydantic',
+    'join_seconds': 'Время объединения каталога с локальными данными',
+    'graph_seconds': 'Время построения графика',
+    'page_render_seconds': 'Полное время прогона скрипта Streamlit по страницам',
+    'refresh_seconds': 'Время фонового обновления данных',
+}
+
+
+class Series:
+    """Одна серия (метрика + метки): счётчик, сумма, гистограмма и последние значения."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SIZE)
+        # Неизменная часть строки журнала (метрика и метки), см. Registry.observe
+        self.log_prefix = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+
+class MetricsLog:
+    """
+    JSONL-журнал наблюдений. Строки копятся в буфере и дописываются пачками
+    (см. LOG_BATCH, LOG_FLUSH_SECONDS) в один открытый файл, вне общей блокировки
+    метрик. Остаток буфера записывается при выходе.
+    """
+
+    def __init__(self, path, batch=LOG_BATCH, flush_seconds=LOG_FLUSH_SECONDS):
+        self.path = path
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self._lines = []
+        self._flushed_at = time.monotonic()
+        self._file = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def write(self, line):
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) < self.batch and time.monotonic() - self._flushed_at < self.flush_seconds:
+                return
+        self.flush()
+
+    def flush(self):
+        # Пачку забираем под блокировкой буфера, а пишем под блокировкой файла,
+        # чтобы наблюдения из других потоков не ждали записи на диск
+        with self._write_lock:
+            with self._lock:
+                lines, self._lines = self._lines, []
+                self._flushed_at = time.monotonic()
+            if not lines:
+                return
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.writelines(lines)
+            self._file.flush()
+
+
+class Registry:
+    """Потокобезопасное хранилище метрик процесса; с log_path наблюдения пишутся и в MetricsLog."""
+
+    def __init__(self, log_path=METRICS_LOG):
+        self.log = MetricsLog(log_path) if log_path else None
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series(METRIC_BUCKETS.get(name, TIME_BUCKETS))
+            series.observe(value)
+            if self.log is not None and series.log_prefix is None:
+                series.log_prefix = '{' + json.dumps({'metric': name, 'labels': labels}, ensure_ascii=False)[1:-1]
+        if self.log is not None:
+            # Метрика и метки сериализуются один раз на серию, в строке меняются только время и значение
+            self.log.write(f'{series.log_prefix}, "ts": {time.time()!r}, "value": {json.dumps(value)}}}\n')
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def summary(self):
+        """Сводка по сериям: число наблюдений, сумма, среднее, p50/p95/max по последним значениям."""
+        with self._lock:
+            items = [(name, dict(labels), series.count, series.sum, list(series.recent))
+                     for (name, labels), series in self._series.items()]
+        rows = []
+        for name, labels, count, total, recent in sorted(items, key=lambda item: (item[0], sorted(item[1].items()))):
+            recent = np.asarray(recent)
+            rows.append({
+                'metric': name,
+                'labels': ', '.join(f'{k}={v}' for k, v in labels.items()),
+                'count': count,
+                'sum': total,
+                'mean': total / count if count else 0.0,
+                'p50': float(np.percentile(recent, 50)) if len(recent) else 0.0,
+                'p95': float(np.percentile(recent, 95)) if len(recent) else 0.0,
+                'max': float(recent.max()) if len(recent) else 0.0,
+            })
+        return rows
+
+    def prometheus_text(self):
+        """Все метрики в текстовом формате Prometheus (гистограммы)."""
+        with self._lock:
+            snapshot = [(name, labels, series.buckets, list(series.bucket_counts), series.count, series.sum)
+                        for (name, labels), series in sorted(self._series.items())]
+        lines = []
+        described = set()
+        for name, labels, buckets, bucket_counts, count, total in snapshot:
+            metric = PREFIX + name
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {metric} {DESCRIPTIONS.get(name, name)}')
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{_labels(labels, le=repr(float(bound)))} {cumulative}')
+            lines.append(f'{metric}_bucket{_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{metric}_sum{_labels(labels)} {total}')
+            lines.append(f'{metric}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+REGISTRY = Registry()
+
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Замеряет длительность блока и записывает её в метрику name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    """Декоратор: длительность каждого вызова функции в метрику name с меткой function."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(name, function=function.__name__, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port=None):
+    """
+    Поднимает эндпоинт /metrics в фоновом потоке. Без порта (и без
+    LIDERTEX_METRICS_PORT) ничего не делает и возвращает None.
+    """
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    server = ThreadingHTTPServer(('0.0.0.0', int(port)), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='lidertex-metrics', daemon=True).start()
+    return server
@@ -3,6 +3,8 @@ from typing import List
 from typing import Optional
 from datetime import datetime
 
+from fields import NO_PROMO, PRODUCT_FIELDS, product_url
+
 class Price(BaseModel):
     total: conint(ge=0)
 
@@ -12,6 +14,33 @@ class Size(BaseModel):
 class Color(BaseModel):
     name: str
 
+class ProductRecord:
+    """
+    Товар каталога в компактном виде: поля по коротким идентификаторам из
+    fields.PRODUCT_FIELDS в слотах (без словаря на каждый товар), ссылка на
+    товар не хранится, а строится из id. Подписи — только в to_dict.
+    """
+    __slots__ = ('id', 'name', 'rating', 'feedbacks', 'promo', 'price', 'stock', 'colors', 'pics')
+
+    def __init__(self, id, name, rating, feedbacks, promo, price, stock, colors, pics):
+        self.id = id
+        self.name = name
+        self.rating = rating
+        self.feedbacks = feedbacks
+        self.promo = promo
+        self.price = price
+        self.stock = stock
+        self.colors = colors
+        self.pics = pics
+
+    @property
+    def url(self):
+        return product_url(self.id)
+
+    def to_dict(self):
+        """Товар в виде dict с подписями полей (для выгрузок и внешних вызовов)."""
+        return {label: getattr(self, field) for field, label in PRODUCT_FIELDS.items()}
+
 class Product(BaseModel):
     name: str
     reviewRating: float
@@ -23,26 +52,91 @@ class Product(BaseModel):
     sizes: List[Size]
     id: int
 
+    def extract_record(self):
+        return ProductRecord(
+            id=self.id,
+            name=self.name,
+            rating=self.reviewRating,
+            feedbacks=self.feedbacks,
+            promo=self.promoTextCard or NO_PROMO,
+            price=(self.sizes[0].price.total / 100) if self.sizes else 0.0,
+            stock=self.totalQuantity,
+            colors=len(self.colors),
+            pics=self.pics,
+        )
+
     def extract_data(self):
-        return {
-            "Название": self.name,
-            "Рейтинг": self.reviewRating,
-            "Количество отзывов": self.feedbacks,
-            "Акция": self.promoTextCard or "Нет акции",
-            "Цена (руб)": (self.sizes[0].price.total / 100) if self.sizes else 0.0,
-            "Общий остаток": self.totalQuantity,
-            "Количество цветов": len(self.colors),
-            "Количество фото": self.pics,
-            "WB": f"https://www.wildberries.ru/catalog/{self.id}/detail.aspx",
-            "ID": self.id
-        }
+        return self.extract_record().to_dict()
+
+    @staticmethod
+    def record_from_raw(raw):
+        """
+        То же, что extract_record, но прямо из сырого dict без валидации.
+        Только для уже проверенных данных (кэш, снимки, записанные ответы).
+        """
+        sizes = raw.get('sizes') or []
+        return ProductRecord(
+            id=raw['id'],
+            name=raw['name'],
+            rating=raw['reviewRating'],
+            feedbacks=raw['feedbacks'],
+            promo=raw.get('promoTextCard') or NO_PROMO,
+            price=(sizes[0]['price']['total'] / 100) if sizes else 0.0,
+            stock=raw['totalQuantity'],
+            colors=len(raw['colors']),
+            pics=raw['pics'],
+        )
+
+    @staticmethod
+    def extract_raw(raw):
+        """Product.record_from_raw в виде dict с подписями, как extract_data."""
+        return Product.record_from_raw(raw).to_dict()
 
 class Data(BaseModel):
     products: List[Product]
+    # Общее число товаров бренда (есть не во всех версиях ответа API)
+    total: Optional[conint(ge=0)] = None
 
 class Payload(BaseModel):
     data: Data
 
+# Карточки товаров (card.wb.ru/cards/v2/detail): остатки по складам и цены по размерам
+class CardStock(BaseModel):
+    wh: int
+    qty: conint(ge=0)
+
+class CardSize(BaseModel):
+    name: str = ''
+    origName: str = ''
+    stocks: List[CardStock] = []
+    price: Optional[Price] = None
+
+class Card(BaseModel):
+    id: int
+    sizes: List[CardSize] = []
+
+    def extract_data(self):
+        stocks = {}
+        for size in self.sizes:
+            for stock in size.stocks:
+                stocks[stock.wh] = stocks.get(stock.wh, 0) + stock.qty
+        prices = [{"Размер": size.origName or size.name or '-', "Цена (руб)": size.price.total / 100}
+                  for size in self.sizes if size.price is not None]
+        return {
+            "ID": self.id,
+            "Складов с остатком": sum(1 for qty in stocks.values() if qty > 0),
+            "Остатки по складам": [{"Склад": wh, "Остаток": qty} for wh, qty in sorted(stocks.items())],
+            "Цены по размерам": prices,
+            "Мин. цена размера (руб)": min((size["Цена (руб)"] for size in prices), default=None),
+            "Макс. цена размера (руб)": max((size["Цена (руб)"] for size in prices), default=None),
+        }
+
+class CardData(BaseModel):
+    products: List[Card]
+
+class CardPayload(BaseModel):
+    data: CardData
+
 class SupplierData(BaseModel):
     id: conint(ge=0)
     valuation: str
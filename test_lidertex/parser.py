@@ -1,7 +1,15 @@
-import requests
+import asyncio
+import hashlib
+import math
+from concurrent.futures import ThreadPoolExecutor
 import os
 import json
+import time
 from headers import (
+    BRAND_ID,
+    SUPPLIER_ID,
+    brand_referer,
+    seller_referer,
     product_headers,
     product_params,
     vote_headers,
@@ -9,134 +17,497 @@ from headers import (
     seller_info_headers,
     legal_info_headers
 )
-from models import Data, SupplierData, SupplierLegalInfo
+from pydantic import ValidationError
+from models import Data, Payload, Product, SupplierData, SupplierLegalInfo
+from session import HttpSession
+from cache import CacheEntry, ResponseCache
+from fixtures import FixtureRecorder
+from metrics import timer
+from resilience import ParserError, Resilience
+from local_cache import load_local_table
+from frames import join_frame
+
+CATALOG_URL = 'https://catalog.wb.ru/brands/v2/catalog'
+# Сколько страниц каталога запрашиваем одновременно
+CATALOG_CONCURRENCY = 8
+
+# Режимы валидации каталога (см. Parser.get_products)
+VALIDATION_MODES = ('strict', 'fast', 'trusted')
+
+# Размеры пулов соединений: каталогу нужен пул не меньше числа параллельных страниц
+POOL_SIZES = {
+    'catalog.wb.ru': CATALOG_CONCURRENCY,
+    'card.wb.ru': 4,
+    'www.wildberries.ru': 2,
+    'suppliers-shipment-2.wildberries.ru': 2,
+    'static-basket-01.wbbasket.ru': 2,
+}
+
+# Локальные данные (выгрузка аналитики по SKU); путь от модуля, а не от рабочего каталога
+LOCAL_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'local_data', 'local_data.json')
+
+# Время жизни закэшированных ответов по эндпоинтам, в секундах
+CACHE_TTL = {
+    'votes': 5 * 60,
+    'seller_info': 30 * 60,
+    'legal_info': 24 * 60 * 60,
+}
 
 
 class Parser:
-    def __init__(self):
-        self.product_headers = product_headers
-        self.product_params = product_params
-        self.vote_headers = vote_headers
-        self.vote_data = vote_data
-        self.seller_info_headers = seller_info_headers
-        self.legal_info_headers = legal_info_headers
-
-    def get_products(self):
+    def __init__(self, brand_id=BRAND_ID, supplier_id=SUPPLIER_ID, session=None, cache=None,
+                 local_data_path=LOCAL_DATA_PATH, record_to=None):
+        self.brand_id = str(brand_id)
+        self.supplier_id = str(supplier_id)
+        self.local_data_path = local_data_path
+        # Переменная окружения LIDERTEX_API_ROOT направляет запросы на подменный сервер (standin)
+        self.session = session or HttpSession(POOL_SIZES, api_root=os.environ.get('LIDERTEX_API_ROOT'),
+                                              resilience=Resilience(host_limits=POOL_SIZES))
+        # Режим записи: ответы API сохраняются в zip-архив для standin.
+        # Включается аргументом record_to или переменной окружения LIDERTEX_RECORD_TO.
+        # Чужую (общую) сессию не трогаем: запись на ней включает её владелец (CrawlScheduler)
+        if session is None:
+            record_to = record_to or os.environ.get('LIDERTEX_RECORD_TO')
+            if record_to:
+                self.session.recorder = FixtureRecorder(record_to)
+        elif record_to:
+            raise ValueError("record_to задаётся для общей сессии при её создании, а не в Parser")
+        # Дисковый уровень кэша включается переменной окружения LIDERTEX_CACHE_DIR
+        self.cache = cache or ResponseCache(disk_dir=os.environ.get('LIDERTEX_CACHE_DIR'))
+        self.cache_ttl = dict(CACHE_TTL)
+        # Режим trusted: хэши тел страниц каталога, уже прошедших валидацию, по номеру страницы.
+        # Словарь не больше числа страниц каталога и не вытесняется другими ответами; тела не храним
+        self.validated_pages = {}
+
+        # Копии словарей из headers с подставленными брендом и продавцом;
+        # общий модульный словарь при этом не меняется
+        self.product_headers = {**product_headers, 'referer': brand_referer(self.brand_id)}
+        self.product_params = {**product_params, 'brand': self.brand_id}
+        self.vote_headers = {**vote_headers, 'referer': brand_referer(self.brand_id)}
+        self.vote_data = {**vote_data, 'brandId': self.brand_id}
+        self.seller_info_headers = {**seller_info_headers, 'referer': seller_referer(self.supplier_id)}
+        self.legal_info_headers = {**legal_info_headers, 'referer': seller_referer(self.supplier_id)}
+
+    def connection_stats(self):
+        return self.session.stats()
+
+    def fetch_page_content(self, page):
+        """
+        Тело ответа страницы каталога (bytes).
+        Ошибочный ответ (после всех повторов) — ParserError: каталог без
+        страницы был бы молча обрезан.
+        """
+        response = self.session.get(
+            CATALOG_URL,
+            params={**self.product_params, 'page': page},
+            headers=self.product_headers
+        )
+
+        # Проверяем статус ответа
+        if response.status_code != 200:
+            raise ParserError(f"Страница каталога {page}: ошибка {response.status_code}: {response.text}",
+                              response.status_code)
+
+        return response.content
+
+    def fetch_page(self, page):
+        """
+        Загружает одну страницу каталога.
+        Возвращает содержимое поля data ответа (dict) или None, если в ответе нет товаров.
+        """
+        content = self.fetch_page_content(page)
+
+        # Проверяем структуру
+        json_data = json.loads(content)
+        if 'data' not in json_data or 'products' not in json_data['data']:
+            print("Ошибка: отсутствует data или products в ответе API")
+            return None
+
+        return json_data['data']
+
+    def fetch_page_validated(self, page):
+        """
+        Загружает страницу и валидирует её прямо из байтов ответа
+        (Payload.model_validate_json), минуя промежуточный dict.
+        Возвращает объект Data или None, если в ответе нет товаров.
+        """
+        return self.validate_page(self.fetch_page_content(page))
+
+    @staticmethod
+    def validate_page(content):
+        """Payload.model_validate_json тела страницы; Data или None, если в ответе нет товаров."""
+        try:
+            with timer('validation_seconds', model='Payload'):
+                return Payload.model_validate_json(content).data
+        except ValidationError as e:
+            # Отсутствие data/products — ошибка формата ответа, как в fetch_page;
+            # ошибки в самих товарах пробрасываем дальше
+            if all(error['type'] == 'missing' and error['loc'] in (('data',), ('data', 'products'))
+                   for error in e.errors()):
+                print("Ошибка: отсутствует data или products в ответе API")
+                return None
+            raise
+
+    def fetch_page_trusted(self, page):
+        """
+        Страница для режима trusted: {'products': [ProductRecord], 'total': ...} или None.
+
+        Без валидации разбираются только страницы, тело которых совпадает
+        (по хэшу) с уже проверенным телом той же страницы (validated_pages).
+        Новое тело из сети валидируется как в fast и только после этого
+        запоминается, поэтому испорченный ответ API даёт ValidationError,
+        а не KeyError или значения не того типа.
+        """
+        content = self.fetch_page_content(page)
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+
+        if self.validated_pages.get(page) == digest:
+            data = json.loads(content)['data']
+            return {'products': [Product.record_from_raw(product) for product in data['products']],
+                    'total': data.get('total')}
+
+        data = self.validate_page(content)
+        if data is None:
+            self.validated_pages.pop(page, None)
+            return None
+        self.validated_pages[page] = digest
+        return {'products': [product.extract_record() for product in data.products], 'total': data.total}
+
+    def get_raw_pages(self, concurrency=1, fetch=None):
+        """
+        Возвращает непустые страницы каталога в порядке номеров.
+        fetch — загрузчик одной страницы (по умолчанию fetch_page, сырые dict).
+        При concurrency > 1 страницы загружаются параллельно (см. get_raw_pages_async).
+        """
+        fetch = fetch or self.fetch_page
+        if concurrency > 1:
+            return asyncio.run(self.get_raw_pages_async(concurrency, fetch))
+
         page = 1
-        products = []
+        pages = []
         while True:
-            self.product_params['page'] = page
-            response = requests.get(
-                'https://catalog.wb.ru/brands/v2/catalog',
-                params=self.product_params,
-                headers=self.product_headers
-            )
-
-            # Проверяем статус ответа
-            if response.status_code != 200:
-                print(f"Ошибка {response.status_code}: {response.text}")
+            data = fetch(page)
+            if _is_last_page(data):
                 break
 
-            # Проверяем структуру и валидируем
-            json_data = response.json()
-            if 'data' not in json_data or 'products' not in json_data['data']:
-                print("Ошибка: отсутствует data или products в ответе API")
-                break
+            pages.append(data)
+            page += 1
+
+        return pages
+
+    async def get_raw_pages_async(self, concurrency=CATALOG_CONCURRENCY, fetch=None):
+        """
+        Параллельная загрузка каталога с ограничением числа одновременных запросов.
+
+        Первая страница загружается отдельно: если API вернул total, по нему
+        считаем число страниц и запрашиваем их все сразу. Иначе запрашиваем
+        страницы «наперёд» окнами по concurrency штук, пока не встретится
+        пустая страница. Результат собирается строго в порядке страниц.
+        """
+        fetch_page = fetch or self.fetch_page
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(page):
+            async with semaphore:
+                return await asyncio.to_thread(fetch_page, page)
 
-            data = Data.model_validate(json_data['data'])
-            if not data.products:
+        first = await fetch(1)
+        if _is_last_page(first):
+            return []
+
+        pages = {1: first}
+        total = _page_total(first)
+        if total is not None:
+            last_page = math.ceil(total / len(_page_products(first)))
+            results = await asyncio.gather(*(fetch(p) for p in range(2, last_page + 1)))
+            pages.update(zip(range(2, last_page + 1), results))
+            # total мог устареть между запросами — дочитываем хвост по одной странице
+            page = last_page + 1
+            while not _is_last_page(pages[page - 1]):
+                pages[page] = await fetch(page)
+                page += 1
+        else:
+            page = 2
+            while True:
+                window = range(page, page + concurrency)
+                results = await asyncio.gather(*(fetch(p) for p in window))
+                pages.update(zip(window, results))
+                if any(_is_last_page(data) for data in results):
+                    break
+                page += concurrency
+
+        # Склеиваем страницы по порядку до первой пустой (ошибочные страницы уже подняли ParserError)
+        ordered = []
+        for page in sorted(pages):
+            if _is_last_page(pages[page]):
                 break
-            
-            products.extend(data.products)
-            page += 1
-    
-        return [product.extract_data() for product in products]
-    
+            ordered.append(pages[page])
+        return ordered
+
+    def iter_pages(self, concurrency=CATALOG_CONCURRENCY, fetch=None):
+        """
+        Непустые страницы каталога по одной, в порядке номеров, по мере загрузки.
+
+        В отличие от get_raw_pages каталог целиком не собирается: одновременно
+        загружается не больше concurrency страниц, и в памяти держатся только они.
+        Ошибочная страница поднимает ParserError; уже отданные страницы остаются у вызывающего.
+        """
+        fetch = fetch or self.fetch_page
+        first = fetch(1)
+        if _is_last_page(first):
+            return
+        total = _page_total(first)
+        # По total знаем последнюю страницу и не запрашиваем лишних
+        last_page = math.ceil(total / len(_page_products(first))) if total else None
+
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        pending = {}
+        next_page = 2
+
+        def fill():
+            nonlocal next_page
+            while len(pending) < concurrency and (last_page is None or next_page <= last_page):
+                pending[next_page] = executor.submit(fetch, next_page)
+                next_page += 1
+
+        try:
+            fill()
+            yield first
+            page = 2
+            while True:
+                if page not in pending:
+                    # total мог устареть — дочитываем хвост по одной странице
+                    pending[page] = executor.submit(fetch, page)
+                    next_page = page + 1
+                data = pending.pop(page).result()
+                if _is_last_page(data):
+                    return
+                fill()
+                yield data
+                page += 1
+        finally:
+            # Ошибка или остановка на середине: ещё не начатые загрузки не нужны
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_records(self, concurrency=CATALOG_CONCURRENCY, mode='fast'):
+        """Товары каталога постранично (списки ProductRecord, как у get_records), см. iter_pages."""
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Неизвестный режим валидации: {mode}")
+
+        if mode == 'fast':
+            for page in self.iter_pages(concurrency, fetch=self.fetch_page_validated):
+                yield [product.extract_record() for product in page.products]
+        elif mode == 'trusted':
+            for page in self.iter_pages(concurrency, fetch=self.fetch_page_trusted):
+                yield page['products']
+        else:
+            for page in self.iter_pages(concurrency):
+                with timer('validation_seconds', model='Data'):
+                    products = Data.model_validate(page).products
+                yield [product.extract_record() for product in products]
+
+    def get_raw_products(self, concurrency=1):
+        """Сырые (невалидированные) товары бренда в порядке выдачи каталога."""
+        return [product for page in self.get_raw_pages(concurrency) for product in page['products']]
+
+    def get_records(self, concurrency=1, mode='fast'):
+        """
+        Возвращает все товары бренда в компактном виде (models.ProductRecord).
+
+        Режимы валидации:
+          strict  — response.json() и Data.model_validate по dict (прежний путь);
+          fast    — валидация прямо из байтов ответа, без промежуточного dict;
+          trusted — как fast, но страницы, не изменившиеся с прошлой проверки
+                    (validated_pages), не валидируются повторно: поля берутся
+                    из сырого JSON (Product.record_from_raw), см. fetch_page_trusted.
+
+        Если какая-то страница не загрузилась и после повторов, поднимается
+        ParserError, а не возвращается обрезанный каталог.
+        """
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Неизвестный режим валидации: {mode}")
+
+        if mode == 'fast':
+            pages = self.get_raw_pages(concurrency, fetch=self.fetch_page_validated)
+            return [product.extract_record() for page in pages for product in page.products]
+
+        if mode == 'trusted':
+            pages = self.get_raw_pages(concurrency, fetch=self.fetch_page_trusted)
+            return [record for page in pages for record in page['products']]
+
+        products = []
+        for page in self.get_raw_pages(concurrency):
+            with timer('validation_seconds', model='Data'):
+                products.extend(Data.model_validate(page).products)
+
+        return [product.extract_record() for product in products]
+
+    def get_products(self, concurrency=1, mode='fast'):
+        """Все товары бренда в виде dict с подписями полей (см. get_records и fields.PRODUCT_FIELDS)."""
+        return [record.to_dict() for record in self.get_records(concurrency, mode)]
+
+    def fetch_cached(self, endpoint, method, url, parse, **kwargs):
+        """
+        Запрос с кэшированием ответа на CACHE_TTL[endpoint] секунд.
+
+        Пока запись свежая, сервер не запрашивается, а результат parse берётся
+        из памяти без повторной валидации. Устаревшая запись перепроверяется
+        условным запросом (If-None-Match / If-Modified-Since): на 304 продлеваем
+        её срок и снова обходимся без разбора тела.
+        """
+        key = f"{method} {url} {sorted((kwargs.get('data') or {}).items())}"
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh(self.cache_ttl[endpoint]):
+            if entry.parsed is None:
+                entry.parsed = parse(entry.body)
+            return entry.parsed
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        response = self.session.request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            entry.stored_at = time.time()
+            if entry.parsed is None:
+                entry.parsed = parse(entry.body)
+            self.cache.put(key, entry)
+            return entry.parsed
+
+        if response.status_code != 200:
+            raise ParserError(f"Ошибка при получении данных. Код: {response.status_code}, Сообщение: {response.text}",
+                              response.status_code)
+
+        entry = CacheEntry(
+            body=response.content,
+            stored_at=time.time(),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+        # Разбираем до записи в кэш, чтобы не сохранять невалидный ответ
+        entry.parsed = parse(entry.body)
+        self.cache.put(key, entry)
+        return entry.parsed
+
     def get_votes(self):
-        response = requests.post(
+        return self.fetch_cached(
+            'votes', 'POST',
             'https://www.wildberries.ru/webapi/favorites/brand/getvotesbyid',
+            self.parse_votes,
             headers=self.vote_headers,
             data=self.vote_data,
         )
-        return response.json()['value']['votesCount']
-    
+
     def get_seller_info(self):
-        response = requests.get(
-            'https://suppliers-shipment-2.wildberries.ru/api/v1/suppliers/4112047',
+        return self.fetch_cached(
+            'seller_info', 'GET',
+            f'https://suppliers-shipment-2.wildberries.ru/api/v1/suppliers/{self.supplier_id}',
+            self.parse_seller_info,
             headers=self.seller_info_headers,
         )
 
-        if response.status_code != 200:
-            raise Exception(f"Ошибка при получении данных. Код: {response.status_code}, Сообщение: {response.text}")
+    def get_legal_info(self):
+        return self.fetch_cached(
+            'legal_info', 'GET',
+            f'https://static-basket-01.wbbasket.ru/vol0/data/supplier-by-id/{self.supplier_id}.json',
+            self.parse_legal_info,
+            headers=self.legal_info_headers,
+        )
 
+    @staticmethod
+    def parse_votes(content):
+        return json.loads(content)['value']['votesCount']
+
+    @staticmethod
+    def parse_seller_info(content):
         try:
-            data = SupplierData.model_validate(response.json())
+            with timer('validation_seconds', model='SupplierData'):
+                data = SupplierData.model_validate_json(content)
             return data.extract_data()
         except Exception as e:
-            raise Exception(f"Ошибка валидации данных: {e}")
-    
-    def get_legal_info(self):
-        response = requests.get('https://static-basket-01.wbbasket.ru/vol0/data/supplier-by-id/4112047.json', 
-                                headers=self.legal_info_headers)
-        if response.status_code != 200:
-            raise Exception(f"Ошибка при получении данных. Код: {response.status_code}, Сообщение: {response.text}")
+            raise ParserError(f"Ошибка валидации данных: {e}")
+
+    @staticmethod
+    def parse_legal_info(content):
         try:
-            legal_data = SupplierLegalInfo.model_validate(response.json())
+            with timer('validation_seconds', model='SupplierLegalInfo'):
+                legal_data = SupplierLegalInfo.model_validate_json(content)
             return legal_data.extract_data()
         except Exception as e:
-            raise Exception(f"Ошибка валидации данных: {e}")
-        
-    def get_local_json(self):
-        file_path = os.path.join("test_lidertex/local_data", "local_data.json")
+            raise ParserError(f"Ошибка валидации данных: {e}")
 
-        with open(file_path, "r", encoding="utf-8") as file:
+    def get_local_json(self):
+        with open(self.local_data_path, "r", encoding="utf-8") as file:
             data = json.load(file)
 
         return data
-        
 
-    def get_combined_data(self):
-        json_data_1 = self.get_products()
-        json_data_2 = self.get_local_json()
+    def get_local_table(self):
+        """Локальные данные из бинарного кэша с индексом по SKU (см. local_cache)."""
+        return load_local_table(self.local_data_path)
+
+    def get_combined_data(self, concurrency=CATALOG_CONCURRENCY):
+        return combine_products(self.get_records(concurrency), self.get_local_table())
+
+    def get_combined_frame(self, concurrency=CATALOG_CONCURRENCY):
+        """То же объединение, что get_combined_data, но сразу в типизированный DataFrame."""
+        return join_frame(self.get_records(concurrency), self.get_local_table())
+
+
+def _page_products(page):
+    # Страница — либо сырой dict, либо провалидированный Data
+    return page['products'] if isinstance(page, dict) else page.products
+
+
+def _page_total(page):
+    return page.get('total') if isinstance(page, dict) else page.total
+
+
+def _is_last_page(page):
+    return page is None or not _page_products(page)
+
+
+def combine_products(records, local_table):
+    """
+    Товары каталога (ProductRecord), у которых есть строка в локальных данных,
+    объединённые с ней в dict с подписями полей (в порядке каталога).
+    """
+    with timer('join_seconds', function='combine_products'):
+        # Позиции товаров каталога в локальных данных (по SKU), -1 — товара там нет
+        positions = local_table.lookup([record.id for record in records])
 
         combined_data = []
+        for record, position in zip(records, positions):
+            if position >= 0:
+                combined_data.append(combine_product(record.to_dict(), local_table.row(position)))
+
+    return combined_data
+
 
-        sku_dict = {product['SKU']: product for product in json_data_2}
-
-        for product_1 in json_data_1:
-            product_id = product_1.get('ID')
-
-            # Если товар из первого JSON есть во втором JSON (по SKU)
-            if product_id in sku_dict:
-                # Получаем товар из второго JSON по SKU
-                product_2 = sku_dict[product_id]
-
-                # Объединяем данные из обоих JSON
-                combined_product = {
-                    'Название': product_1['Название'],
-                    'Рейтинг': product_1['Рейтинг'],
-                    'Количество отзывов': product_1['Количество отзывов'],
-                    'Акция': product_1['Акция'],
-                    'Цена (руб)': product_1['Цена (руб)'],
-                    'Общий остаток': product_1['Общий остаток'],
-                    'Количество цветов': product_1['Количество цветов'],
-                    'Количество фото': product_1['Количество фото'],
-                    'WB': product_1['WB'],
-                    'ID': product_1['ID'],
-                    'SKU': product_2['SKU'],
-                    'Выручка, ₽': product_2['Выручка, ₽'],
-                    'Упущенная выручка, ₽': product_2['Упущенная выручка, ₽'],
-                    'Продажи, кол-во': product_2['Продажи, кол-во'],
-                    'График продаж': product_2['График продаж'],
-                    'Оборачиваемость, дн.': product_2['Оборачиваемость, дн.'],
-                    'График остатков': product_2['График остатков'],
-                    'Скидка': product_2['Скидка'],
-                    'График изменения цены': product_2['График изменения цены'],
-                    'Дробный рейтинг': product_2['Дробный рейтинг'],
-                    'Ср. рейтинг последних отзывов': product_2['Ср. рейтинг последних отзывов'],
-                    'Дней на маркетплейсе': product_2['Дней на маркетплейсе'],
-                    'Средняя рекламная ставка, ₽': product_2['Средняя рекламная ставка, ₽']
-                }
-                combined_data.append(combined_product)
-        
-        return combined_data
+def combine_product(product_1, product_2):
+    """Объединяет товар из каталога (product_1) с его строкой из локальных данных (product_2)."""
+    return {
+        'Название': product_1['Название'],
+        'Рейтинг': product_1['Рейтинг'],
+        'Количество отзывов': product_1['Количество отзывов'],
+        'Акция': product_1['Акция'],
+        'Цена (руб)': product_1['Цена (руб)'],
+        'Общий остаток': product_1['Общий остаток'],
+        'Количество цветов': product_1['Количество цветов'],
+        'Количество фото': product_1['Количество фото'],
+        'WB': product_1['WB'],
+        'ID': product_1['ID'],
+        'SKU': product_2['SKU'],
+        'Выручка, ₽': product_2['Выручка, ₽'],
+        'Упущенная выручка, ₽': product_2['Упущенная выручка, ₽'],
+        'Продажи, кол-во': product_2['Продажи, кол-во'],
+        'График продаж': product_2['График продаж'],
+        'Оборачиваемость, дн.': product_2['Оборачиваемость, дн.'],
+        'График остатков': product_2['График остатков'],
+        'Скидка': product_2['Скидка'],
+        'График изменения цены': product_2['График изменения цены'],
+        'Дробный рейтинг': product_2['Дробный рейтинг'],
+        'Ср. рейтинг последних отзывов': product_2['Ср. рейтинг последних отзывов'],
+        'Дней на маркетплейсе': product_2['Дней на маркетплейсе'],
+        'Средняя рекламная ставка, ₽': product_2['Средняя рекламная ставка, ₽']
+    }
@@ -0,0 +1,62 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TokenBucket:
+    """
+    Ведро токенов: в среднем не больше rate запросов в секунду,
+    кратковременно — до burst запросов подряд.
+    """
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError(f"rate должен быть больше нуля, получено {rate}")
+        if burst < 1:
+            raise ValueError(f"burst должен быть не меньше 1, получено {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Блокирует поток, пока в ведре не появится токен."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """
+    Общий для всех парсеров ограничитель запросов: глобальное ведро токенов
+    плюс лимит одновременных запросов к каждому хосту.
+    """
+
+    def __init__(self, rate, burst=None, host_limits=None, default_host_limit=4):
+        self.bucket = TokenBucket(rate, burst or rate)
+        self.host_limits = dict(host_limits or {})
+        self.default_host_limit = default_host_limit
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                limit = self.host_limits.get(host, self.default_host_limit)
+                self._semaphores[host] = threading.BoundedSemaphore(limit)
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, host):
+        """Занимает слот хоста и токен на время одного запроса."""
+        with self._semaphore(host):
+            self.bucket.acquire()
+            yield
@@ -0,0 +1,143 @@
+import os
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import pandas as pd
+
+from frames import data_version, read_only_frame
+from incremental import CatalogSnapshot
+from metrics import timer
+from series import SeriesSet
+
+# Период фонового обновления, в секундах; переопределяется переменной окружения LIDERTEX_REFRESH_INTERVAL.
+# 0 отключает фоновое обновление: показывается только последний сохранённый снимок
+REFRESH_INTERVAL = float(os.environ.get('LIDERTEX_REFRESH_INTERVAL', 10 * 60))
+
+
+@dataclass(frozen=True)
+class DatasetVersion:
+    """
+    Опубликованная версия данных. После публикации не изменяется: сессии
+    читают её без блокировок, новая версия просто заменяет ссылку.
+
+    frame общий для всех сессий и доступен только для чтения (frames.read_only_frame):
+    изменение значений на месте поднимает ValueError, менять можно только копию.
+    """
+    frame: pd.DataFrame
+    series: SeriesSet
+    version: str
+    published_at: datetime
+    # 'live' — результат обхода каталога, 'snapshot' — сохранённый снимок
+    source: str
+    changes: Any = None
+
+    def age(self, now=None):
+        """Возраст данных в секундах."""
+        now = now or datetime.now(timezone.utc)
+        return (now - self.published_at).total_seconds()
+
+
+class Refresher:
+    """
+    Фоновое обновление данных, одно на процесс.
+
+    Поток раз в interval секунд (или по request_refresh) обходит каталог,
+    сохраняет результат в историю снимков и публикует новую DatasetVersion.
+    Пока первого обхода не было, опубликован последний сохранённый снимок.
+    """
+
+    def __init__(self, parser, store, interval=REFRESH_INTERVAL):
+        self.parser = parser
+        self.store = store
+        self.interval = interval
+        self.snapshot = CatalogSnapshot()
+        self.current: Optional[DatasetVersion] = None
+        self.refreshing = False
+        self.last_error = None
+        self.last_error_at = None
+        self._wakeup = threading.Event()
+        self._published = threading.Condition()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name='lidertex-refresher', daemon=True)
+
+    def start(self):
+        """Публикует сохранённый снимок (если есть) и запускает фоновый поток."""
+        path = self.store.latest_path()
+        if path is not None:
+            frame, taken_at = self.store.read(path)
+            # База для изменений: иначе первый обход после перезапуска покажет все товары новыми
+            self.snapshot.seed(frame)
+            self._publish(frame, taken_at, 'snapshot')
+        if self.interval > 0:
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop = True
+        self._wakeup.set()
+
+    def latest(self):
+        """Последняя опубликованная версия или None, если данных ещё нет. Не блокирует."""
+        return self.current
+
+    def wait(self, timeout=None):
+        """Ждёт, пока будет опубликована хоть одна версия; возвращает её или None по таймауту."""
+        with self._published:
+            self._published.wait_for(lambda: self.current is not None, timeout)
+            return self.current
+
+    def request_refresh(self):
+        """Запускает внеочередное обновление; повторные вызовы во время обхода не плодят обходы."""
+        self._wakeup.set()
+
+    def refresh(self):
+        """Один обход каталога с публикацией результата (вызывается из фонового потока)."""
+        self.refreshing = True
+        try:
+            with timer('refresh_seconds'):
+                frame, changes = self.snapshot.refresh(self.parser)
+
+                # Информация о продавце в истории не обязательна: её сбой не мешает обновлению
+                try:
+                    seller_info = self.parser.get_seller_info()
+                except Exception:
+                    seller_info = None
+                try:
+                    votes = self.parser.get_votes()
+                except Exception:
+                    votes = None
+                taken_at = self.store.write(frame, seller_info, votes)
+
+                self._publish(frame, taken_at, 'live', changes)
+                self.last_error = None
+        finally:
+            self.refreshing = False
+
+    def _publish(self, frame, published_at, source, changes=None):
+        frame = read_only_frame(frame)
+        published = DatasetVersion(
+            frame=frame,
+            series=SeriesSet.from_columns(frame),
+            version=data_version(frame),
+            published_at=published_at,
+            source=source,
+            changes=changes,
+        )
+        with self._published:
+            self.current = published
+            self._published.notify_all()
+
+    def _run(self):
+        while not self._stop:
+            self._wakeup.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                # Ошибку показываем в интерфейсе; опубликованная версия остаётся прежней
+                self.last_error = e
+                self.last_error_at = datetime.now(timezone.utc)
+                traceback.print_exc()
+            self._wakeup.wait(self.interval)
@@ -0,0 +1,241 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Коды, после которых запрос стоит повторить: лимит запросов и временные ошибки сервера
+THROTTLE_STATUSES = (429,)
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+RETRY_STATUSES = THROTTLE_STATUSES + SERVER_ERROR_STATUSES
+
+# Ошибки соединения, после которых тоже повторяем запрос (в том числе обрыв тела ответа)
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class ParserError(Exception):
+    """Источник данных не ответил корректно (в том числе после всех повторов)."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(ParserError):
+    """Хост временно отключён автоматом: запрос не отправлялся."""
+
+
+class RetryPolicy:
+    """
+    Экспоненциальная задержка с полным разбросом (full jitter):
+    перед попыткой n ждём случайное время от 0 до min(max_delay, base_delay * 2**n).
+    Если сервер прислал Retry-After, ждём не меньше указанного.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, max_retry_after=120.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+
+def retry_after_seconds(response):
+    """Значение заголовка Retry-After в секундах (число или HTTP-дата) или None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Автомат хоста: после failure_threshold ошибок подряд хост отключается
+    на reset_timeout секунд, затем пропускается одна пробная попытка.
+    Успех пробной попытки снова включает хост, любой другой исход (ошибка,
+    429, исключение) — отключает повторно. Если исход пробы так и не пришёл,
+    через reset_timeout пропускается следующая проба.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if ((self.state == self.OPEN and now - self.opened_at >= self.reset_timeout)
+                    or (self.state == self.HALF_OPEN and now - self.probe_at >= self.reset_timeout)):
+                self.state = self.HALF_OPEN
+                self.probe_at = now
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record_inconclusive(self):
+        """
+        Исход, который ничего не говорит о поломке хоста (429, неожиданное исключение):
+        счётчик ошибок не растёт, но неудачная проба снова отключает хост.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class AdaptiveLimit:
+    """
+    Число одновременных запросов к хосту по схеме AIMD: каждый успешный
+    ответ увеличивает лимит на 1/limit (примерно +1 за «раунд» запросов),
+    429/5xx уменьшает его в decrease раз, но не чаще раза в cooldown секунд,
+    чтобы пачка ошибок из одного раунда не обрушила лимит до минимума.
+    """
+
+    def __init__(self, maximum, minimum=1, decrease=0.5, cooldown=1.0):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight < max(self.minimum, int(self.limit)))
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            now = time.monotonic()
+            if now - self._decreased_at >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._decreased_at = now
+
+
+class Resilience:
+    """
+    Повторы, автоматы и адаптивная параллельность для всех запросов HttpSession.
+
+    Каждый хост получает свой CircuitBreaker и AdaptiveLimit (верхняя граница —
+    host_limits[хост] или default_limit). Запросы с ответом из RETRY_STATUSES
+    и ошибками соединения повторяются по policy; после последней попытки
+    возвращается последний ответ, а ошибка соединения превращается в ParserError.
+    """
+
+    def __init__(self, policy=None, host_limits=None, default_limit=16,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.policy = policy or RetryPolicy()
+        self.host_limits = dict(host_limits or {})
+        self.default_limit = default_limit
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._limits = {}
+        self._retries = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._limits[host] = AdaptiveLimit(self.host_limits.get(host, self.default_limit))
+                self._retries[host] = 0
+            return self._breakers[host], self._limits[host]
+
+    def call(self, host, send):
+        """Выполняет send() (один HTTP-запрос к host) с повторами; возвращает ответ."""
+        breaker, limit = self._host(host)
+        for attempt in range(self.policy.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Хост {host} временно отключён после серии ошибок")
+
+            limit.acquire()
+            try:
+                response = send()
+                error = None
+            except TRANSPORT_ERRORS as e:
+                response, error = None, e
+            except BaseException:
+                # Исход попытки должен дойти до автомата, иначе проба в HALF_OPEN не завершится
+                breaker.record_inconclusive()
+                raise
+            finally:
+                limit.release()
+
+            status = response.status_code if response is not None else None
+            if status not in RETRY_STATUSES and error is None:
+                breaker.record_success()
+                limit.on_success()
+                return response
+
+            # 429 — просьба сбавить темп, а не поломка хоста: в счётчик ошибок автомата не идёт
+            limit.on_throttle()
+            if status in THROTTLE_STATUSES:
+                breaker.record_inconclusive()
+            else:
+                breaker.record_failure()
+            if attempt == self.policy.max_attempts - 1:
+                break
+            with self._lock:
+                self._retries[host] += 1
+            time.sleep(self.policy.delay(attempt, retry_after_seconds(response) if response is not None else None))
+
+        if error is not None:
+            raise ParserError(f"Нет связи с {host} после {self.policy.max_attempts} попыток: {error}") from error
+        return response
+
+    def stats(self):
+        """Состояние по хостам: автомат, текущий лимит параллельности, число повторов."""
+        with self._lock:
+            return {
+                host: {
+                    'circuit': self._breakers[host].state,
+                    'limit': round(self._limits[host].limit, 2),
+                    'in_flight': self._limits[host].in_flight,
+                    'retries': self._retries[host],
+                }
+                for host in self._breakers
+            }
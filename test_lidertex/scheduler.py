@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from cache import ResponseCache
+from fixtures import FixtureRecorder
+from parser import Parser
+from ratelimit import RateLimiter
+from resilience import Resilience
+from session import HttpSession
+
+# Глобальный лимит запросов в секунду и допустимый всплеск
+DEFAULT_RATE = 10
+DEFAULT_BURST = 20
+
+# Сколько запросов одновременно допускаем к каждому хосту
+HOST_LIMITS = {
+    'catalog.wb.ru': 8,
+    'card.wb.ru': 4,
+    'www.wildberries.ru': 2,
+    'suppliers-shipment-2.wildberries.ru': 2,
+    'static-basket-01.wbbasket.ru': 2,
+}
+
+
+@dataclass(frozen=True)
+class CrawlTarget:
+    brand_id: str
+    # Продавец бренда; без него собираются только товары и избранное
+    supplier_id: Optional[str] = None
+
+
+class CrawlScheduler:
+    """
+    Обходит несколько брендов/продавцов одновременно.
+
+    Все парсеры делят одну HTTP-сессию, один кэш ответов и один
+    ограничитель запросов, поэтому общий темп обращений к API не зависит
+    от числа брендов, а нагрузка на каждый хост ограничена HOST_LIMITS.
+    """
+
+    def __init__(self, targets, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None,
+                 workers=4, catalog_concurrency=4, api_root=None, record_to=None):
+        self.targets = list(targets)
+        self.workers = workers
+        self.catalog_concurrency = catalog_concurrency
+        host_limits = host_limits or HOST_LIMITS
+        self.limiter = RateLimiter(rate, burst, host_limits)
+        # Пул каждого хоста не меньше его лимита, иначе слоты будут ждать соединений
+        self.session = HttpSession(pool_sizes=host_limits, limiter=self.limiter,
+                                   api_root=api_root or os.environ.get('LIDERTEX_API_ROOT'),
+                                   resilience=Resilience(host_limits=host_limits))
+        # Запись ответов — свойство общей сессии: один архив на все бренды
+        record_to = record_to or os.environ.get('LIDERTEX_RECORD_TO')
+        if record_to:
+            self.session.recorder = FixtureRecorder(record_to)
+        self.cache = ResponseCache()
+
+    def parser_for(self, target):
+        """Парсер бренда на общих сессии, кэше и ограничителе."""
+        return Parser(
+            brand_id=target.brand_id,
+            supplier_id=target.supplier_id or '',
+            session=self.session,
+            cache=self.cache,
+        )
+
+    def crawl_target(self, target):
+        """Собирает данные одного бренда; ошибки источников складываются в 'errors'."""
+        parser = self.parser_for(target)
+        result = {'supplier_id': target.supplier_id, 'errors': {}}
+
+        sources = {
+            'products': lambda: parser.get_products(self.catalog_concurrency),
+            'votes': parser.get_votes,
+        }
+        if target.supplier_id:
+            sources['seller_info'] = parser.get_seller_info
+            sources['legal_info'] = parser.get_legal_info
+
+        for name, fetch in sources.items():
+            try:
+                result[name] = fetch()
+            except Exception as e:
+                result[name] = None
+                result['errors'][name] = str(e)
+        return result
+
+    def run(self):
+        """
+        Возвращает словарь {CrawlTarget: данные} в порядке targets.
+        Ключ — цель целиком: один бренд у разных продавцов даёт разные записи.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(self.crawl_target, self.targets)
+            return dict(zip(self.targets, results))
+
+
+def combined_products(dataset):
+    """Склеивает товары всех целей в один список, добавляя поля 'Бренд' и 'Продавец'."""
+    rows = []
+    for target, result in dataset.items():
+        for product in result.get('products') or []:
+            rows.append({**product, 'Бренд': target.brand_id, 'Продавец': target.supplier_id})
+    return rows
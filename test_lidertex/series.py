@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Длина ряда: значения по дням за 30 дней
+SERIES_LENGTH = 30
+
+SALES_COLUMN = 'График продаж'
+STOCK_COLUMN = 'График остатков'
+PRICE_COLUMN = 'График изменения цены'
+
+
+class SeriesMatrix(NamedTuple):
+    # Матрица (n_sku, SERIES_LENGTH); у невалидных строк заполнена нулями
+    values: np.ndarray
+    # Маска строк, которые удалось разобрать ровно в SERIES_LENGTH чисел
+    valid: np.ndarray
+
+    def total(self):
+        """Поэлементная сумма валидных рядов по всем товарам."""
+        return self.values[self.valid].sum(axis=0)
+
+
+def parse_series(values, length=SERIES_LENGTH):
+    """
+    Разбирает строки вида "5, 8, 11, ..." в матрицу SeriesMatrix.
+
+    Строки с числом элементов, отличным от length, помечаются невалидными
+    сразу по количеству запятых. Остальные разбираются одним вызовом NumPy;
+    если среди них есть нечисловые значения, разбираем их построчно.
+    """
+    strings = [v if isinstance(v, str) else '' for v in values]
+    n = len(strings)
+    matrix = np.zeros((n, length), dtype=np.float64)
+    valid = np.zeros(n, dtype=bool)
+
+    commas = np.fromiter((s.count(',') for s in strings), dtype=np.int64, count=n)
+    candidates = np.flatnonzero(commas == length - 1)
+    if len(candidates) == 0:
+        return SeriesMatrix(matrix, valid)
+
+    try:
+        flat = np.array(','.join(strings[i] for i in candidates).split(','), dtype=np.float64)
+        matrix[candidates] = flat.reshape(len(candidates), length)
+        valid[candidates] = True
+    except ValueError:
+        for i in candidates:
+            try:
+                matrix[i] = np.array(strings[i].split(','), dtype=np.float64)
+                valid[i] = True
+            except ValueError:
+                continue
+
+    return SeriesMatrix(matrix, valid)
+
+
+class SeriesSet:
+    """
+    Три 30-дневных ряда товаров (продажи, остатки, цена), разобранные один раз
+    при загрузке данных. Строки матриц выровнены со строками таблицы товаров.
+    """
+
+    def __init__(self, sales, stock, price):
+        self.sales = sales
+        self.stock = stock
+        self.price = price
+
+    @classmethod
+    def from_columns(cls, columns):
+        """columns — DataFrame или словарь {название столбца: значения}."""
+        return cls(
+            sales=parse_series(columns[SALES_COLUMN]),
+            stock=parse_series(columns[STOCK_COLUMN]),
+            price=parse_series(columns[PRICE_COLUMN]),
+        )
@@ -0,0 +1,123 @@
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import observe
+
+# urllib3 умеет распаковывать br только при установленном пакете brotli,
+# поэтому просим br у сервера лишь когда сможем его прочитать
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Размер пула соединений для хостов, которых нет в pool_sizes
+DEFAULT_POOL_SIZE = 4
+# Таймаут (подключение, чтение) в секундах, чтобы зависший хост не держал вызывающего
+DEFAULT_TIMEOUT = (5, 30)
+
+
+class HttpSession:
+    """
+    Общая HTTP-сессия парсера: keep-alive соединения переиспользуются
+    между страницами каталога, эндпоинтами и перезапусками Streamlit.
+
+    Для каждого хоста из pool_sizes монтируется отдельный адаптер со своим
+    размером пула, остальные хосты обслуживает адаптер по умолчанию.
+    Если передан limiter (см. ratelimit.RateLimiter), каждый запрос
+    проходит через его слот для соответствующего хоста.
+
+    api_root перенаправляет все запросы на подменный сервер (см. standin):
+    https://<хост>/<путь> превращается в <api_root>/<хост>/<путь>.
+    recorder (см. fixtures.FixtureRecorder) записывает ответы для воспроизведения.
+    resilience (см. resilience.Resilience) повторяет запросы при 429/5xx и ошибках
+    соединения и подстраивает число одновременных запросов к каждому хосту.
+    """
+
+    def __init__(self, pool_sizes=None, default_pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 limiter=None, api_root=None, recorder=None, resilience=None):
+        self.timeout = timeout
+        self.limiter = limiter
+        self.resilience = resilience
+        self.api_root = api_root.rstrip('/') if api_root else None
+        self.recorder = recorder
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+        self.session.mount('https://', self._make_adapter(default_pool_size))
+        self.session.mount('http://', self._make_adapter(default_pool_size))
+        for host, size in (pool_sizes or {}).items():
+            self.session.mount(f'https://{host}', self._make_adapter(size))
+
+    @staticmethod
+    def _make_adapter(pool_size):
+        # pool_block=True: при нехватке соединений ждём свободное,
+        # а не открываем лишнее, которое потом будет закрыто
+        return HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+
+    def target_url(self, url):
+        """Адрес, по которому реально уходит запрос (с учётом api_root)."""
+        if not self.api_root:
+            return url
+        parts = urlsplit(url)
+        target = f'{self.api_root}/{parts.hostname}{parts.path}'
+        return f'{target}?{parts.query}' if parts.query else target
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        # Лимиты считаем по исходному хосту, даже если запрос уходит на подменный сервер
+        host = urlsplit(url).hostname
+        if self.resilience is None:
+            return self._send(host, method, url, **kwargs)
+        return self.resilience.call(host, lambda: self._send(host, method, url, **kwargs))
+
+    def _send(self, host, method, url, **kwargs):
+        """Одна попытка запроса: слот ограничителя, сам запрос, метрики и запись ответа."""
+        slot = self.limiter.slot(host) if self.limiter else nullcontext()
+        with slot:
+            start = time.perf_counter()
+            response = self.session.request(method, self.target_url(url), **kwargs)
+            observe('http_request_seconds', time.perf_counter() - start, host=host, status=response.status_code)
+        observe('http_response_bytes', len(response.content), host=host)
+        if self.recorder is not None:
+            self.recorder.record(method, url, kwargs.get('params'), kwargs.get('data'), response)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """
+        Статистика переиспользования соединений по хостам:
+        сколько запросов отправлено, сколько соединений открыто
+        и какая доля запросов ушла по уже открытому соединению.
+        """
+        stats = {}
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = stats.setdefault(key.key_host, {'requests': 0, 'connections': 0, 'pool_size': 0})
+                host['requests'] += pool.num_requests
+                host['connections'] += pool.num_connections
+                host['pool_size'] = max(host['pool_size'], pool.pool.maxsize if pool.pool else 0)
+
+        for host in stats.values():
+            reused = max(host['requests'] - host['connections'], 0)
+            host['reuse_ratio'] = reused / host['requests'] if host['requests'] else 0.0
+        return stats
+
+    def close(self):
+        self.session.close()
+        if self.recorder is not None:
+            self.recorder.close()
@@ -0,0 +1,167 @@
+import glob
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from frames import compact_frame
+
+# Каталог снимков по умолчанию; переопределяется переменной окружения LIDERTEX_SNAPSHOT_DIR
+SNAPSHOT_DIR = os.environ.get(
+    'LIDERTEX_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'),
+)
+
+# Хранение истории. По умолчанию история не удаляется: она и нужна для графиков цен,
+# остатков и рейтинга. Если задан KEEP_DAYS, после каждого сохранения удаляются снимки
+# старше KEEP_DAYS дней, если KEEP_LAST — в каждом наборе остаются только столько последних.
+# Переменные окружения LIDERTEX_SNAPSHOT_KEEP_DAYS и LIDERTEX_SNAPSHOT_KEEP_LAST; 0 — без ограничения
+KEEP_DAYS = int(os.environ.get('LIDERTEX_SNAPSHOT_KEEP_DAYS', 0))
+KEEP_LAST = int(os.environ.get('LIDERTEX_SNAPSHOT_KEEP_LAST', 0))
+
+# Наборы, которые пишет SnapshotStore.write
+DATASETS = ('products', 'seller_info', 'votes')
+
+# Столбец с моментом снимка (UTC), добавляется ко всем наборам
+SNAPSHOT_COLUMN = 'Дата снимка'
+
+# Партиционирование по дню снимка: <набор>/date=YYYY-MM-DD/<время>.parquet
+PARTITIONING = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+
+
+class SnapshotStore:
+    """
+    История обновлений в колоночном виде (Parquet), разбитая по дням.
+
+    Каждое обновление пишет по файлу в каждый набор. Последний снимок
+    читается одним файлом без обхода истории; запросы по истории читают
+    только нужные дни (партиции) и столбцы. После каждого сохранения
+    старые снимки удаляются по keep_days/keep_last, если они заданы (см. prune).
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, keep_days=KEEP_DAYS, keep_last=KEEP_LAST):
+        self.root = root
+        self.keep_days = keep_days
+        self.keep_last = keep_last
+
+    def _partition_dir(self, dataset, taken_at):
+        return os.path.join(self.root, dataset, f'date={taken_at:%Y-%m-%d}')
+
+    def _write(self, dataset, frame, taken_at):
+        directory = self._partition_dir(dataset, taken_at)
+        os.makedirs(directory, exist_ok=True)
+        name = f'{taken_at:%H%M%S%f}.parquet'
+        frame = frame.assign(**{SNAPSHOT_COLUMN: pd.Timestamp(taken_at)})
+        # Разрядность целых в памяти зависит от данных; на диске держим int64,
+        # чтобы схема файлов разных дней совпадала
+        frame = frame.astype({column: 'int64' for column in frame.columns if frame[column].dtype.kind in 'iu'})
+        # Пишем во временный файл (скрытый, его не видит ни glob, ни pyarrow.dataset)
+        # и переименовываем, чтобы читатели не видели недописанный снимок
+        tmp_path = os.path.join(directory, f'.{name}.tmp')
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    def write(self, products, seller_info=None, votes=None, taken_at=None):
+        """Сохраняет результат одного обновления; возвращает момент снимка."""
+        taken_at = taken_at or datetime.now(timezone.utc)
+        self._write('products', products, taken_at)
+        if seller_info is not None:
+            self._write('seller_info', pd.DataFrame([seller_info]), taken_at)
+        if votes is not None:
+            self._write('votes', pd.DataFrame({'Количество добавлений в избранное': [votes]}), taken_at)
+        self.prune(now=taken_at)
+        return taken_at
+
+    def _files(self, dataset):
+        """Файлы снимков набора от старых к новым: [(день, путь)]."""
+        files = []
+        for day in sorted(glob.glob(os.path.join(self.root, dataset, 'date=*'))):
+            date = os.path.basename(day)[len('date='):]
+            files.extend((date, path) for path in sorted(glob.glob(os.path.join(day, '*.parquet'))))
+        return files
+
+    def prune(self, now=None):
+        """
+        Удаляет снимки старше keep_days дней и сверх keep_last последних в каждом наборе.
+        Самый свежий снимок набора не удаляется никогда: с него стартует приложение.
+        Возвращает число удалённых файлов.
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = f'{now - timedelta(days=self.keep_days):%Y-%m-%d}' if self.keep_days else None
+        removed = 0
+        for dataset in DATASETS:
+            files = self._files(dataset)
+            if not files:
+                continue
+            expired = files[:-1]
+            if self.keep_last:
+                keep = set(path for _, path in files[-self.keep_last:])
+            else:
+                keep = set(path for _, path in files)
+            for date, path in expired:
+                if path in keep and (cutoff is None or date >= cutoff):
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    continue
+            # Пустые партиции мешают только обходу каталога — убираем и их
+            for day in glob.glob(os.path.join(self.root, dataset, 'date=*')):
+                try:
+                    os.rmdir(day)
+                except OSError:
+                    pass
+        return removed
+
+    def latest_path(self, dataset='products'):
+        """Путь к самому свежему файлу набора или None, если снимков нет."""
+        days = sorted(glob.glob(os.path.join(self.root, dataset, 'date=*')))
+        for day in reversed(days):
+            files = sorted(glob.glob(os.path.join(day, '*.parquet')))
+            if files:
+                return files[-1]
+        return None
+
+    def latest(self, dataset='products'):
+        """Последний снимок набора: (DataFrame, момент снимка) или (None, None)."""
+        path = self.latest_path(dataset)
+        if path is None:
+            return None, None
+        return self.read(path)
+
+    @staticmethod
+    def read(path):
+        """Один снимок по пути файла: (DataFrame, момент снимка)."""
+        frame = pd.read_parquet(path)
+        if len(frame):
+            taken_at = frame[SNAPSHOT_COLUMN].iloc[0]
+        else:
+            # В пустом снимке столбец пуст — момент берём из пути .../date=YYYY-MM-DD/HHMMSSffffff.parquet
+            day = os.path.basename(os.path.dirname(path))[len('date='):]
+            time_of_day = os.path.splitext(os.path.basename(path))[0]
+            taken_at = pd.Timestamp(datetime.strptime(f'{day} {time_of_day}', '%Y-%m-%d %H%M%S%f')
+                                    .replace(tzinfo=timezone.utc))
+        return compact_frame(frame.drop(columns=[SNAPSHOT_COLUMN])), taken_at
+
+    def history(self, columns, dataset='products', start=None, end=None):
+        """
+        История столбцов columns за дни [start, end] (даты или строки YYYY-MM-DD).
+        Читаются только попавшие в диапазон партиции и только нужные столбцы.
+        """
+        directory = os.path.join(self.root, dataset)
+        if not os.path.isdir(directory):
+            return pd.DataFrame(columns=[SNAPSHOT_COLUMN, *columns])
+
+        dataset = ds.dataset(directory, format='parquet', partitioning=PARTITIONING)
+        condition = None
+        if start is not None:
+            condition = ds.field('date') >= str(start)
+        if end is not None:
+            upper = ds.field('date') <= str(end)
+            condition = upper if condition is None else condition & upper
+
+        table = dataset.to_table(columns=[SNAPSHOT_COLUMN, *columns], filter=condition)
+        return table.to_pandas().sort_values(SNAPSHOT_COLUMN, kind='stable', ignore_index=True)
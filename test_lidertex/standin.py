@@ -0,0 +1,246 @@
+"""
+Подменный сервер API WB для нагрузочных прогонов без обращения к настоящему API.
+
+Отвечает на запросы вида <адрес сервера>/<исходный хост>/<путь> (так их
+переписывает HttpSession с api_root): сначала ищет ответ в архиве записей
+(см. fixtures, Parser(record_to=...)), а если его нет — строит синтетический
+ответ. Умеет добавлять задержку с разбросом и отвечать 429/5xx с заданной долей.
+
+Запуск:
+    python test_lidertex/standin.py [--fixtures records.zip] [--catalog-size 100000]
+                                    [--latency 0.05] [--jitter 0.02] [--rate-429 0.05] [--rate-5xx 0.01]
+
+Затем приложение или парсер запускаются с LIDERTEX_API_ROOT=http://127.0.0.1:8765.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from fixtures import load_fixtures, request_key
+from headers import SUPPLIER_ID
+
+DEFAULT_PORT = 8765
+# Размер синтетического каталога, если его страниц нет в архиве записей
+DEFAULT_CATALOG_SIZE = 1000
+PRODUCTS_PER_PAGE = 100
+
+
+def synthetic_catalog_page(page, per_page=PRODUCTS_PER_PAGE, total=None):
+    """
+    Страница, похожая на ответ каталога: много полей, которые парсер не использует.
+    При заданном total последняя страница неполная, а страницы за ней пустые.
+    """
+    rng = random.Random(page)
+    count = per_page if total is None else max(0, min(per_page, total - (page - 1) * per_page))
+    products = []
+    for i in range(count):
+        product_id = page * per_page + i
+        products.append({
+            'id': product_id,
+            'root': product_id * 7,
+            'kindId': 0,
+            'brand': 'Лидер Дом',
+            'brandId': 310641905,
+            'siteBrandId': 0,
+            'colors': [{'name': rng.choice(['белый', 'чёрный', 'серый']), 'id': rng.randint(1, 10 ** 6)}
+                       for _ in range(rng.randint(1, 3))],
+            'subjectId': rng.randint(1, 5000),
+            'subjectParentId': rng.randint(1, 500),
+            'name': f'Товар {product_id}',
+            'entity': 'полотенце',
+            'supplier': 'ЛИДЕР ДОМ',
+            'supplierId': 4112047,
+            'supplierRating': 4.8,
+            'supplierFlags': 0,
+            'pics': rng.randint(1, 20),
+            'rating': 5,
+            'reviewRating': round(rng.uniform(3, 5), 1),
+            'nmReviewRating': round(rng.uniform(3, 5), 1),
+            'feedbacks': rng.randint(0, 5000),
+            'nmFeedbacks': rng.randint(0, 5000),
+            'volume': rng.randint(1, 100),
+            'viewFlags': 0,
+            'promoTextCard': rng.choice([None, 'ВЕСЕННЯЯ РАСПРОДАЖА']),
+            'sizes': [{
+                'name': size, 'origName': size, 'rank': 0, 'optionId': rng.randint(1, 10 ** 9),
+                'wh': rng.randint(1, 10 ** 6), 'time1': 2, 'time2': 30, 'dtype': 4,
+                'price': {'basic': 500000, 'product': 300000, 'total': rng.randint(10000, 300000), 'logistics': 0, 'return': 0},
+                'saleConditions': 0, 'payload': 'x' * 40,
+            } for size in ('S', 'M', 'L')],
+            'totalQuantity': rng.randint(0, 1000),
+            'logs': 'y' * 60,
+            'meta': {'tokens': [], 'presetId': 0},
+        })
+    return json.dumps({'state': 0, 'payloadVersion': 2, 'data': {'products': products, 'total': 100 * per_page if total is None else total}}).encode()
+
+
+def synthetic_cards(ids):
+    """Карточки товаров ids (ответ card.wb.ru/cards/v2/detail): остатки по складам и цены по размерам."""
+    products = []
+    for product_id in ids:
+        rng = random.Random(product_id)
+        products.append({
+            'id': product_id,
+            'name': f'Товар {product_id}',
+            'sizes': [{
+                'name': size, 'origName': size, 'optionId': rng.randint(1, 10 ** 9),
+                'stocks': [{'wh': rng.choice((507, 117986, 120762, 206348)), 'dtype': 4,
+                            'qty': rng.randint(0, 300), 'priority': 1, 'time1': 2, 'time2': 30}
+                           for _ in range(rng.randint(0, 3))],
+                'price': {'basic': 500000, 'product': 300000, 'total': rng.randint(10000, 300000), 'logistics': 0, 'return': 0},
+            } for size in ('S', 'M', 'L')],
+        })
+    return json.dumps({'state': 0, 'payloadVersion': 2, 'data': {'products': products}}, ensure_ascii=False).encode()
+
+
+def synthetic_response(host, path, query, catalog_size):
+    """Синтетический ответ (код, тело) для известных эндпоинтов или None."""
+    if host == 'catalog.wb.ru':
+        return 200, synthetic_catalog_page(int(query.get('page', 1)), total=catalog_size)
+    if host == 'card.wb.ru':
+        return 200, synthetic_cards([int(nm) for nm in query.get('nm', '').split(';') if nm])
+    if path.endswith('/getvotesbyid'):
+        return 200, json.dumps({'value': {'votesCount': 1234}}).encode()
+    if '/suppliers/' in path:
+        return 200, json.dumps({
+            'id': int(path.rsplit('/', 1)[-1] or SUPPLIER_ID), 'valuation': '4.8', 'feedbacksCount': 10000,
+            'registrationDate': '2020-01-01T00:00:00Z', 'saleItemQuantity': 500000, 'suppRatio': 90,
+            'isPremium': True,
+        }).encode()
+    if '/supplier-by-id/' in path:
+        return 200, json.dumps({
+            'supplierId': int(SUPPLIER_ID), 'supplierName': 'ЛИДЕР ДОМ', 'supplierFullName': 'ООО "ЛИДЕР ДОМ"',
+            'inn': '1234567890', 'ogrn': '1234567890123', 'legalAddress': 'г. Москва', 'trademark': 'Лидер Дом',
+            'kpp': '123456789', 'taxpayerCode': '1234567890',
+        }, ensure_ascii=False).encode()
+    return None
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures=None, catalog_size=DEFAULT_CATALOG_SIZE,
+                 latency=0.0, jitter=0.0, rate_429=0.0, rate_5xx=0.0, seed=None):
+        super().__init__(address, StandInHandler)
+        self.fixtures = fixtures or {}
+        self.catalog_size = catalog_size
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        # Счётчики ответов по кодам, для сверки с тем, что увидел клиент
+        self.counts = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def draw(self):
+        """Случайные величины одного ответа: (доля для выбора ошибки, отклонение задержки, код 5xx)."""
+        with self.random_lock:
+            return (self.random.random(), self.random.uniform(-self.jitter, self.jitter),
+                    self.random.choice((500, 502, 503)))
+
+    def count(self, status):
+        with self.random_lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.respond('GET', None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.respond('POST', self.rfile.read(length).decode() if length else None)
+
+    def respond(self, method, form):
+        server = self.server
+        chance, jitter, error_status = server.draw()
+        time.sleep(max(0.0, server.latency + jitter))
+
+        if chance < server.rate_429:
+            return self.send(429, b'{"error": "too many requests"}', {'Retry-After': '1'})
+        if chance < server.rate_429 + server.rate_5xx:
+            return self.send(error_status, b'{"error": "upstream"}')
+
+        # Путь: /<исходный хост>/<исходный путь>?<параметры>
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        path = '/' + path
+        url = f'https://{host}{path}' + (f'?{parts.query}' if parts.query else '')
+
+        fixture = server.fixtures.get(request_key(method, url, data=form))
+        if fixture is not None:
+            status, content_type, body = fixture
+            return self.send(status, body, {'Content-Type': content_type})
+
+        synthetic = synthetic_response(host, path, dict(parse_qsl(parts.query)), server.catalog_size)
+        if synthetic is None:
+            return self.send(404, b'{"error": "no fixture"}')
+        status, body = synthetic
+        return self.send(status, body)
+
+    def send(self, status, body, headers=None):
+        self.server.count(status)
+        self.send_response(status)
+        headers = {'Content-Type': 'application/json; charset=utf-8', **(headers or {})}
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Журнал каждого запроса заметно замедляет сервер под нагрузкой
+        pass
+
+
+def start_server(port=0, **options):
+    """Запускает сервер в фоновом потоке (port=0 — любой свободный порт) и возвращает его."""
+    server = StandInServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, name='lidertex-standin', daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument('--fixtures', help='архив записей (Parser(record_to=...) или LIDERTEX_RECORD_TO)')
+    arg_parser.add_argument('--catalog-size', type=int, default=DEFAULT_CATALOG_SIZE,
+                            help='число товаров синтетического каталога')
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help='разброс задержки ±, с')
+    arg_parser.add_argument('--rate-429', type=float, default=0.0, help='доля ответов 429')
+    arg_parser.add_argument('--rate-5xx', type=float, default=0.0, help='доля ответов 5xx')
+    arg_parser.add_argument('--seed', type=int, help='зерно генератора для повторяемых прогонов')
+    args = arg_parser.parse_args()
+
+    server = StandInServer(
+        ('127.0.0.1', args.port),
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        catalog_size=args.catalog_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        seed=args.seed,
+    )
+    print(f'Подменный API: {server.url} (LIDERTEX_API_ROOT={server.url})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import numpy as np
+
+STOCK_COLUMN = 'Общий остаток'
+
+# Границы остатка: меньше 30 — мало, меньше 100 — средне, иначе достаточно
+STOCK_THRESHOLDS = (30, 100)
+STOCK_COLORS = ('red', 'yellow', 'lightgreen')
+
+PAGE_SIZES = (50, 100, 500, 1000)
+
+
+def stock_styles(stock, thresholds=STOCK_THRESHOLDS, colors=STOCK_COLORS):
+    """CSS цвета текста для столбца остатков; нечисловые значения остаются без стиля."""
+    stock = np.asarray(stock, dtype=np.float64)
+    low, high = thresholds
+    return np.select(
+        [stock < low, stock < high, stock >= high],
+        [f'color: {color}' for color in colors],
+        default='',
+    )
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def table_page(df, sort_column=None, ascending=True, page=1, page_size=PAGE_SIZES[0]):
+    """
+    Страница таблицы (нумерация с 1) после сортировки на сервере.
+    Сортируется только порядок строк; в браузер уходит одна страница.
+    """
+    start = (page - 1) * page_size
+    if sort_column is None:
+        return df.iloc[start:start + page_size]
+
+    values = df[sort_column]
+    if values.dtype.kind in 'iuf':
+        # Для чисел достаточно argsort по массиву NumPy, таблица целиком не переставляется;
+        # по убыванию сортируем -values, чтобы равные значения сохранили исходный порядок
+        values = values.to_numpy(dtype=np.float64)
+        order = np.argsort(values if ascending else -values, kind='stable')
+        return df.iloc[order[start:start + page_size]]
+    return df.sort_values(sort_column, ascending=ascending, kind='stable').iloc[start:start + page_size]
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Модули приложения и бенчмарков импортируются по плоским именам (как в app.py и benchmarks)
+sys.path.insert(0, os.path.join(ROOT, 'test_lidertex'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
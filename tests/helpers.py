@@ -0,0 +1,61 @@
+"""Общие заготовки тестов: сырые товары каталога и локальные данные."""
+import json
+
+from local_cache import build_table
+from parser import Parser
+
+
+def raw_product(product_id, price=1000, stock=5, promo=None):
+    return {
+        'id': product_id,
+        'name': f'Товар {product_id}',
+        'reviewRating': 4.5,
+        'feedbacks': 10,
+        'promoTextCard': promo,
+        'totalQuantity': stock,
+        'colors': [{'name': 'белый'}],
+        'pics': 3,
+        'sizes': [{'price': {'total': price * 100}}],
+    }
+
+
+def local_record(sku, revenue=100):
+    return {
+        'SKU': sku,
+        'Выручка, ₽': revenue,
+        'Упущенная выручка, ₽': 0,
+        'Продажи, кол-во': 1,
+        'График продаж': '[1, 2, 3]',
+        'Оборачиваемость, дн.': 10.0,
+        'График остатков': '[5, 5, 5]',
+        'Скидка': 0,
+        'График изменения цены': '[100, 100, 100]',
+        'Дробный рейтинг': 4.5,
+        'Ср. рейтинг последних отзывов': 4.6,
+        'Дней на маркетплейсе': 100,
+        'Средняя рекламная ставка, ₽': 0,
+    }
+
+
+class FakeCatalogParser:
+    """
+    Парсер с заданными сырыми товарами и локальными данными вместо сети:
+    товары отдаются телами страниц по per_page штук, обход страниц — как в Parser.
+    """
+
+    get_raw_pages = Parser.get_raw_pages
+    get_raw_pages_async = Parser.get_raw_pages_async
+    validate_page = staticmethod(Parser.validate_page)
+
+    def __init__(self, raw_products, skus, per_page=100):
+        self.raw_products = raw_products
+        self.per_page = per_page
+        self.local_table = build_table([local_record(sku) for sku in skus])
+
+    def fetch_page_content(self, page):
+        start = (page - 1) * self.per_page
+        products = self.raw_products[start:start + self.per_page]
+        return json.dumps({'data': {'products': products, 'total': len(self.raw_products)}}).encode()
+
+    def get_local_table(self):
+        return self.local_table
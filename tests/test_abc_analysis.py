@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from abc_analysis import abc_classes, analyze, xyz_classes
+from series import parse_series
+
+
+def test_abc_boundaries_belong_to_the_lower_class():
+    # Доли: 0.80 (ровно граница A), 0.95 (ровно граница B), 1.0
+    order, sorted_values, share, abc = abc_classes([15, 80, 5])
+    assert order.tolist() == [1, 0, 2]
+    assert np.allclose(share, [0.80, 0.95, 1.0])
+    assert abc.tolist() == ['B', 'A', 'C']
+
+
+def test_abc_without_sales_puts_everything_in_c():
+    _, _, share, abc = abc_classes([0, 0, 0])
+    assert np.isnan(share).all()
+    assert abc.tolist() == ['C', 'C', 'C']
+
+
+def test_xyz_thresholds_and_special_rows():
+    flat = ', '.join(['10'] * 30)                       # cv = 0       -> X
+    mild = ', '.join(['9', '11'] * 15)                  # cv = 0.1     -> X (граница)
+    medium = ', '.join(['8', '12'] * 15)                # cv = 0.2     -> Y
+    wild = ', '.join(['0', '20'] * 15)                  # cv = 1.0     -> Z
+    zero = ', '.join(['0'] * 30)                        # без продаж   -> Z
+    broken = '1, 2, 3'                                  # невалидный   -> ''
+    xyz = xyz_classes(parse_series([flat, mild, medium, wild, zero, broken]))
+    assert xyz.tolist() == ['X', 'X', 'Y', 'Z', 'Z', '']
+
+
+def test_analyze_aligns_classes_with_rows_and_caches_by_version():
+    df = pd.DataFrame({
+        'Продажи, кол-во': [5, 70, 25],
+        'Выручка, ₽': [0, 0, 0],
+        'Упущенная выручка, ₽': [0, 0, 0],
+        'График продаж': [', '.join(['1'] * 30)] * 3,
+    })
+    result = analyze(df, 'units', version='test-v1')
+    assert result.classes_frame(df.index)['ABC'].tolist() == ['C', 'A', 'B']
+    assert analyze(df, 'units', version='test-v1') is result
+    assert analyze(df, 'revenue', version='test-v1').abc.tolist() == ['C', 'C', 'C']
@@ -0,0 +1,27 @@
+from bench_suite import compare, find_baseline
+
+
+def run(name, size, best):
+    return {'name': name, 'size': size, 'best': best, 'median': best, 'runs': 1}
+
+
+def test_find_baseline_takes_latest_or_matching_commit():
+    history = [{'commit': 'aaa1111', 'results': []}, {'commit': 'bbb2222', 'results': []}]
+    assert find_baseline(history)['commit'] == 'bbb2222'
+    assert find_baseline(history, 'aaa')['commit'] == 'aaa1111'
+    assert find_baseline(history, 'ccc') is None
+    assert find_baseline([]) is None
+
+
+def test_compare_reports_only_slowdowns_above_threshold(capsys):
+    baseline = {'results': [run('join', 1000, 0.010), run('graph', 1000, 0.010)]}
+    results = [run('join', 1000, 0.030), run('graph', 1000, 0.012), run('new', 1000, 1.0)]
+
+    regressions = compare(results, baseline, threshold=1.5)
+
+    assert [r['name'] for r in regressions] == ['join']
+    assert 'РЕГРЕССИЯ' in capsys.readouterr().out
+
+
+def test_compare_without_baseline_has_no_regressions(capsys):
+    assert compare([run('join', 1000, 1.0)], None, threshold=1.5) == []
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+
+import pyarrow.parquet as pq
+import pytest
+
+from tests.helpers import local_record
+import cli
+from fixtures import request_key
+from headers import vote_data
+from standin import start_server
+
+BRAND = '310641905'
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+VOTES_URL = 'https://www.wildberries.ru/webapi/favorites/brand/getvotesbyid'
+
+
+@pytest.fixture
+def server():
+    # Синтетический каталог из двух страниц: товары 100..199 и 200..249
+    server = start_server(catalog_size=150)
+    yield server
+    server.shutdown()
+
+
+def local_data(tmp_path, skus):
+    path = tmp_path / 'local.json'
+    path.write_text(json.dumps([local_record(sku) for sku in skus]), encoding='utf-8')
+    return str(path)
+
+
+def run(tmp_path, server, skus, *extra):
+    return cli.main(['--target', BRAND, '--api-root', server.url, '--local-data', local_data(tmp_path, skus),
+                     '--output-dir', str(tmp_path / 'out'), '--rate', '1000', *extra])
+
+
+def test_installed_entry_point_writes_parquet_with_declared_schema(tmp_path, server):
+    # Как скрипт lidertex: точка входа импортируется из пакета, без путей из conftest.
+    # Сам импорт пакета sys.path не меняет
+    code = ('import sys; path = list(sys.path); import test_lidertex; assert sys.path == path; '
+            'from test_lidertex.__main__ import main; sys.exit(main(sys.argv[1:]))')
+    args = ['--target', BRAND, '--api-root', server.url, '--local-data', local_data(tmp_path, range(150, 230)),
+            '--output-dir', str(tmp_path / 'out'), '--format', 'parquet', '--cards', '--card-batch-size', '7']
+    env = {name: value for name, value in os.environ.items() if name != 'PYTHONPATH'}
+    result = subprocess.run([sys.executable, '-c', code, *args], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == cli.EXIT_OK, result.stderr
+
+    table = pq.read_table(tmp_path / 'out' / f'{BRAND}.parquet')
+    assert table.schema.equals(cli.output_schema(cards=True))
+    assert table.num_rows == 80
+    assert table.column('Остатки по складам').null_count == 0
+    company = json.loads((tmp_path / 'out' / f'{BRAND}.company.json').read_text(encoding='utf-8'))
+    assert company['votes'] == 1234
+
+
+def test_empty_result_still_writes_parquet_with_schema(tmp_path, server):
+    assert run(tmp_path, server, [1, 2], '--format', 'parquet', '--no-company') == cli.EXIT_OK
+
+    table = pq.read_table(tmp_path / 'out' / f'{BRAND}.parquet')
+    assert table.num_rows == 0
+    assert table.schema.equals(cli.COMBINED_SCHEMA)
+
+
+def test_failed_source_gives_partial_exit_code(tmp_path):
+    votes_key = request_key('POST', VOTES_URL, data={**vote_data, 'brandId': BRAND})
+    server = start_server(catalog_size=150, fixtures={votes_key: (404, 'application/json', b'{}')})
+    try:
+        assert run(tmp_path, server, [100, 101]) == cli.EXIT_PARTIAL
+    finally:
+        server.shutdown()
+
+    rows = (tmp_path / 'out' / f'{BRAND}.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(row)['ID'] for row in rows] == [100, 101]
+    company = json.loads((tmp_path / 'out' / f'{BRAND}.company.json').read_text(encoding='utf-8'))
+    assert company['votes'] is None
+
+
+@pytest.mark.parametrize('args', [['--card-batch-size', '0'], ['--concurrency', '-1'], ['--target', 'abc']])
+def test_invalid_arguments_exit_with_2(args, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(args)
+    assert exit_info.value.code == 2
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pyarrow as pa
+
+from enrichment import CARD_FIELDS, CARD_SCHEMA, batches, enrich_products, fetch_cards
+from models import Card
+from session import HttpSession
+from standin import start_server
+
+
+def test_card_fields_are_lists_of_records():
+    card = Card.model_validate({'id': 1, 'sizes': [
+        {'origName': 'S', 'stocks': [{'wh': 2, 'qty': 3}, {'wh': 1, 'qty': 0}], 'price': {'total': 150000}},
+        {'name': 'M', 'stocks': [{'wh': 2, 'qty': 4}]},
+    ]})
+
+    assert card.extract_data() == {
+        'ID': 1,
+        'Складов с остатком': 1,
+        'Остатки по складам': [{'Склад': 1, 'Остаток': 0}, {'Склад': 2, 'Остаток': 7}],
+        'Цены по размерам': [{'Размер': 'S', 'Цена (руб)': 1500.0}],
+        'Мин. цена размера (руб)': 1500.0,
+        'Макс. цена размера (руб)': 1500.0,
+    }
+    assert Card(id=2).extract_data()['Мин. цена размера (руб)'] is None
+
+
+def test_batches_drop_duplicates_and_keep_order():
+    assert batches([3, 1, 3, 2, 1], size=2) == [[3, 1], [2]]
+
+
+def test_products_without_card_get_nulls_and_stay_nullable_in_parquet():
+    server = start_server()
+    parser = SimpleNamespace(session=HttpSession(api_root=server.url), product_headers={})
+    try:
+        cards = fetch_cards(parser, [1, 2, 3, 1], batch_size=2)
+    finally:
+        parser.session.close()
+        server.shutdown()
+    assert sorted(cards) == [1, 2, 3]
+    assert server.counts == {200: 2}
+
+    del cards[2]
+    rows = enrich_products([{'ID': 1}, {'ID': 2}], cards)
+    assert [rows[1][name] for name in CARD_FIELDS] == [None] * len(CARD_FIELDS)
+
+    table = pa.Table.from_pylist(rows, schema=pa.schema([pa.field('ID', pa.int64()), *CARD_SCHEMA]))
+    restored = table.to_pylist()
+    assert restored[1] == rows[1]
+    assert restored[0]['Остатки по складам'] == cards[1]['Остатки по складам']
+    assert table.column('Мин. цена размера (руб)').null_count == 1
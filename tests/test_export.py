@@ -0,0 +1,44 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from export import SHEET_NAME, export_bytes, write_csv, write_parquet
+
+FRAME = pd.DataFrame({
+    'Название': ['Платье «Лето»', 'Юбка'],
+    'Цена (руб)': [1999.5, 850.0],
+    'Акция': pd.Categorical(['Нет акции', 'Скидка']),
+    'ID': [101, 102],
+})
+
+
+def test_csv_is_utf8_with_bom_and_single_header():
+    content = io.BytesIO()
+    write_csv(FRAME, content, chunk_rows=1)
+    data = content.getvalue()
+
+    assert data.startswith(b'\xef\xbb\xbf')
+    text = data.decode('utf-8-sig')
+    assert text.splitlines()[0] == 'Название,Цена (руб),Акция,ID'
+    assert 'Платье «Лето»' in text
+    assert pd.read_csv(io.BytesIO(data), encoding='utf-8-sig')['ID'].tolist() == [101, 102]
+
+
+def test_excel_keeps_cyrillic_headers_and_values():
+    workbook = load_workbook(io.BytesIO(export_bytes(FRAME, 'xlsx')))
+    rows = list(workbook[SHEET_NAME].values)
+
+    assert rows[0] == tuple(FRAME.columns)
+    assert rows[1] == ('Платье «Лето»', 1999.5, 'Нет акции', 101)
+    assert len(rows) == 3
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 10])
+def test_parquet_round_trip(chunk_rows):
+    content = io.BytesIO()
+    write_parquet(FRAME, content, chunk_rows=chunk_rows)
+    restored = pd.read_parquet(io.BytesIO(content.getvalue()))
+
+    pd.testing.assert_frame_equal(restored, FRAME)
@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+from fixtures import FixtureRecorder, load_fixtures, request_key
+from session import HttpSession
+from standin import start_server, synthetic_catalog_page
+
+VOTES_URL = 'https://example.wb.ru/api/getvotesbyid'
+
+
+def response(status, body=b'{}'):
+    return SimpleNamespace(status_code=status, content=body, headers={'Content-Type': 'application/json'})
+
+
+def test_request_key_ignores_parameter_order_and_source():
+    assert (request_key('get', 'https://a.wb.ru/x?b=2&a=1')
+            == request_key('GET', 'https://a.wb.ru/x', params={'a': 1, 'b': '2'})
+            == request_key('GET', 'https://a.wb.ru/x?b=2', params={'a': 1})
+            == 'GET a.wb.ru/x?a=1&b=2')
+    assert (request_key('POST', 'https://a.wb.ru/x', data={'id': 5, 'k': 'v'})
+            == request_key('POST', 'https://a.wb.ru/x', data='k=v&id=5'))
+
+
+def test_recorder_skips_throttling_and_server_errors(tmp_path):
+    path = tmp_path / 'fixtures.zip'
+    recorder = FixtureRecorder(str(path))
+    for status in (200, 304, 404, 429, 500, 503):
+        recorder.record('GET', f'https://a.wb.ru/{status}', None, None, response(status))
+    recorder.close()
+    recorder.close()
+
+    assert sorted(status for status, _, _ in load_fixtures(str(path)).values()) == [200, 404]
+
+    # Дозапись в существующий архив продолжает нумерацию
+    recorder = FixtureRecorder(str(path))
+    recorder.record('GET', 'https://a.wb.ru/200', None, None, response(200, b'{"new": 1}'))
+    recorder.close()
+    assert load_fixtures(str(path))['GET a.wb.ru/200'][2] == b'{"new": 1}'
+
+
+def test_recorded_responses_are_replayed_by_standin(tmp_path):
+    path = str(tmp_path / 'fixtures.zip')
+    live = start_server()
+    session = HttpSession(api_root=live.url, recorder=FixtureRecorder(path))
+    try:
+        recorded = session.get(VOTES_URL, params={'id': 7}).content
+    finally:
+        session.close()
+        live.shutdown()
+
+    # Подменяем тело записи, чтобы отличить воспроизведение от синтетического ответа
+    fixtures = load_fixtures(path)
+    key = request_key('GET', VOTES_URL, params={'id': 7})
+    assert fixtures[key][2] == recorded
+    fixtures[key] = (200, 'application/json', b'{"value": {"votesCount": 7}}')
+
+    replay = start_server(fixtures=fixtures)
+    session = HttpSession(api_root=replay.url)
+    try:
+        assert session.get(VOTES_URL, params={'id': 7}).json() == {'value': {'votesCount': 7}}
+        assert session.get(VOTES_URL, params={'id': 8}).json() == {'value': {'votesCount': 1234}}
+    finally:
+        session.close()
+        replay.shutdown()
+
+
+def test_synthetic_catalog_keeps_explicit_zero_total():
+    assert json.loads(synthetic_catalog_page(1, per_page=10, total=0))['data'] == {'products': [], 'total': 0}
+    assert json.loads(synthetic_catalog_page(1, per_page=10))['data']['total'] == 1000
@@ -0,0 +1,60 @@
+from tests.helpers import FakeCatalogParser, raw_product
+from incremental import CatalogSnapshot
+
+
+def test_refresh_reports_added_changed_and_removed_products():
+    snapshot = CatalogSnapshot()
+    parser = FakeCatalogParser([raw_product(1), raw_product(2), raw_product(3)], skus=[1, 2, 3])
+    frame, changes = snapshot.refresh(parser)
+    assert len(frame) == 3
+    assert changes.added == [1, 2, 3]
+
+    parser.raw_products = [raw_product(1), raw_product(2, price=900), raw_product(4, stock=1)]
+    parser.raw_products[0]['totalQuantity'] = 7
+    frame, changes = snapshot.refresh(parser)
+
+    assert changes.added == [4]
+    assert changes.removed == [3]
+    assert changes.price_changed == [2]
+    assert changes.stock_changed == [1]
+    assert sorted(changes.revalidated) == [1, 2, 4]
+    assert frame['ID'].tolist() == [1, 2]
+
+
+def test_unchanged_products_are_not_revalidated():
+    snapshot = CatalogSnapshot()
+    parser = FakeCatalogParser([raw_product(1), raw_product(2)], skus=[1, 2])
+    snapshot.refresh(parser)
+
+    _, changes = snapshot.refresh(parser)
+
+    assert changes.revalidated == []
+    assert changes.summary().startswith('новых: 0')
+
+
+def test_only_changed_pages_are_revalidated():
+    snapshot = CatalogSnapshot()
+    parser = FakeCatalogParser([raw_product(i) for i in range(1, 7)], skus=range(1, 7), per_page=2)
+    snapshot.refresh(parser)
+
+    parser.raw_products[2] = raw_product(3, price=1500)
+    frame, changes = snapshot.refresh(parser)
+
+    assert changes.revalidated == [3, 4]
+    assert changes.price_changed == [3]
+    assert changes.added == changes.removed == changes.stock_changed == []
+    assert frame['ID'].tolist() == list(range(1, 7))
+
+
+def test_seed_from_restored_snapshot_avoids_reporting_everything_as_added():
+    parser = FakeCatalogParser([raw_product(1), raw_product(2), raw_product(3)], skus=[1, 2, 3])
+    restored, _ = CatalogSnapshot().refresh(parser)
+
+    snapshot = CatalogSnapshot()
+    snapshot.seed(restored)
+    parser.raw_products = [raw_product(1), raw_product(2, price=900), raw_product(5)]
+    _, changes = snapshot.refresh(parser)
+
+    assert changes.added == [5]
+    assert changes.removed == [3]
+    assert changes.price_changed == [2]
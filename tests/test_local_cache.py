@@ -0,0 +1,106 @@
+import json
+import os
+
+import numpy as np
+
+from local_cache import META_FILE, build_table, load_local_table
+from tests.helpers import local_record
+
+
+def write_source(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(records, file, ensure_ascii=False)
+
+
+def test_round_trip_matches_source_and_uses_memory_map(tmp_path):
+    source = tmp_path / 'local_data.json'
+    write_source(source, [local_record(3, revenue=30), local_record(1, revenue=10)])
+
+    built = load_local_table(str(source))
+    cached = load_local_table(str(source))
+
+    assert isinstance(cached.columns['SKU'], np.memmap)
+    assert cached.get(1) == built.get(1) == local_record(1, revenue=10)
+    assert cached.get(2) is None
+    assert cached.lookup([3, 2, 1]).tolist() == [0, -1, 1]
+
+
+def test_duplicate_sku_keeps_last_record():
+    table = build_table([local_record(1, revenue=10), local_record(1, revenue=20)])
+    assert table.get(1)['Выручка, ₽'] == 20
+
+
+def test_changed_source_rebuilds_with_new_files_and_keeps_old_maps_valid(tmp_path):
+    source = tmp_path / 'local_data.json'
+    write_source(source, [local_record(1, revenue=10)])
+    old = load_local_table(str(source))
+    old_files = set(os.listdir(tmp_path / '.cache'))
+
+    write_source(source, [local_record(1, revenue=99), local_record(2)])
+    new = load_local_table(str(source))
+
+    assert new.get(1)['Выручка, ₽'] == 99
+    assert len(new) == 2
+    # Прежняя сборка не перезаписана: отображение старой таблицы читает старые данные
+    assert old.get(1)['Выручка, ₽'] == 10
+    new_files = set(os.listdir(tmp_path / '.cache'))
+    assert not (old_files - {META_FILE}) & new_files
+    assert not [name for name in new_files if name.endswith('.tmp')]
+
+
+def test_touched_but_identical_source_reuses_cache(tmp_path):
+    source = tmp_path / 'local_data.json'
+    write_source(source, [local_record(1)])
+    load_local_table(str(source))
+    files = set(os.listdir(tmp_path / '.cache'))
+
+    os.utime(source, ns=(1, 1))
+    table = load_local_table(str(source))
+
+    assert table.get(1) == local_record(1)
+    assert set(os.listdir(tmp_path / '.cache')) == files
+
+
+def test_missing_cache_files_trigger_rebuild(tmp_path):
+    source = tmp_path / 'local_data.json'
+    write_source(source, [local_record(1)])
+    load_local_table(str(source))
+    for name in os.listdir(tmp_path / '.cache'):
+        if name.endswith('.npy'):
+            os.remove(tmp_path / '.cache' / name)
+
+    assert load_local_table(str(source)).get(1) == local_record(1)
+
+
+def test_nulls_bools_and_sparse_records_keep_numeric_columns(tmp_path):
+    records = [
+        {'SKU': 1, 'Выручка, ₽': 5, 'Акция': True, 'Скидка': 1, 'Комментарий': 'есть'},
+        {'SKU': 2, 'Выручка, ₽': None, 'Акция': False, 'Скидка': True},
+        {'SKU': 3, 'Новое поле': 2.5},
+        {'Выручка, ₽': 7},
+    ]
+    source = tmp_path / 'local_data.json'
+    write_source(source, records)
+    built = load_local_table(str(source))
+    cached = load_local_table(str(source))
+
+    for table in (built, cached):
+        assert table.columns['Выручка, ₽'].dtype == np.float64
+        assert table.columns['Скидка'].dtype == np.float64
+        assert table.columns['Акция'].dtype == np.float64
+        row = table.get(1)
+        assert np.isnan(row.pop('Новое поле'))
+        assert row == {'SKU': 1.0, 'Выручка, ₽': 5.0, 'Акция': 1.0, 'Скидка': 1.0, 'Комментарий': 'есть'}
+        assert np.isnan(table.get(2)['Выручка, ₽'])
+        assert table.get(3)['Новое поле'] == 2.5
+        assert table.get(3)['Комментарий'] == ''
+        assert table.lookup([3, 4, 1]).tolist() == [2, -1, 0]
+        assert np.nanmax(table.columns['Выручка, ₽']) == 7
+
+
+def test_column_types():
+    table = build_table([{'SKU': 1, 'a': True, 'b': 1, 'c': 1}, {'SKU': 2, 'a': False, 'b': True, 'c': 2.5}])
+    assert table.columns['a'].dtype == np.bool_
+    assert table.columns['b'].dtype == np.int64
+    assert table.columns['c'].dtype == np.float64
+    assert table.get(2) == {'SKU': 2, 'a': False, 'b': 1, 'c': 2.5}
@@ -0,0 +1,37 @@
+import json
+
+from metrics import Registry
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()] if path.exists() else []
+
+
+def test_log_is_written_in_batches_through_one_handle(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    registry = Registry(str(path))
+    registry.log.batch = 3
+    registry.log.flush_seconds = 3600
+
+    registry.observe('join_seconds', 0.5, function='join_frame')
+    registry.observe('join_seconds', 0.25, function='join_frame')
+    assert read_lines(path) == []
+
+    registry.observe('graph_seconds', 1.0)
+    handle = registry.log._file
+    registry.observe('graph_seconds', 2.0)
+    registry.log.flush()
+
+    lines = read_lines(path)
+    assert [(line['metric'], line['value']) for line in lines] == [
+        ('join_seconds', 0.5), ('join_seconds', 0.25), ('graph_seconds', 1.0), ('graph_seconds', 2.0)]
+    assert lines[0]['labels'] == {'function': 'join_frame'}
+    assert registry.log._file is handle
+    assert registry.summary()[1]['count'] == 2
+
+
+def test_registry_without_log_keeps_only_series():
+    registry = Registry(None)
+    registry.observe('join_seconds', 0.5)
+    assert registry.log is None
+    assert registry.summary()[0]['sum'] == 0.5
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from cache import ResponseCache
+from parser import VALIDATION_MODES, Parser
+from tests.helpers import raw_product
+
+
+def page_body(products, total=None):
+    return json.dumps({'data': {'products': products, 'total': total}}).encode()
+
+
+def offline_parser(pages):
+    """Parser, который отдаёт заданные тела страниц каталога (с 1-й) вместо запросов."""
+    parser = Parser(cache=ResponseCache())
+    parser.fetch_page_content = lambda page: pages[page - 1] if page <= len(pages) else page_body([])
+    return parser
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+def test_all_modes_agree_on_valid_pages():
+    pages = [page_body([raw_product(1), raw_product(2)]), page_body([raw_product(3)])]
+    results = {mode: offline_parser(pages).get_records(1, mode) for mode in VALIDATION_MODES}
+    assert {mode: ids(records) for mode, records in results.items()} == {mode: [1, 2, 3] for mode in VALIDATION_MODES}
+    assert len({tuple(r.to_dict().items()) for records in results.values() for r in records}) == 3
+
+
+def test_trusted_validates_fresh_network_bodies():
+    broken = raw_product(1)
+    del broken['name']
+    broken['feedbacks'] = 'много'
+    parser = offline_parser([page_body([broken])])
+
+    with pytest.raises(ValidationError):
+        parser.get_records(1, 'trusted')
+
+
+def test_trusted_skips_validation_only_for_already_validated_bodies(monkeypatch):
+    pages = [page_body([raw_product(1)])]
+    parser = offline_parser(pages)
+    validated = []
+    original = Parser.validate_page
+    monkeypatch.setattr(parser, 'validate_page', lambda content: validated.append(content) or original(content))
+
+    assert ids(parser.get_records(1, 'trusted')) == [1]
+    assert ids(parser.get_records(1, 'trusted')) == [1]
+    assert len(validated) == 2   # первая страница и пустая завершающая; повтор без валидации
+
+    pages[0] = page_body([raw_product(1, price=5)])
+    assert parser.get_records(1, 'trusted')[0].price == 5
+    assert len(validated) == 3
+
+
+def test_trusted_skips_every_page_of_a_large_catalog_without_caching_bodies(monkeypatch):
+    # Больше страниц, чем вмещает LRU ResponseCache: пропуск не должен зависеть от его размера
+    pages = [page_body([raw_product(page)]) for page in range(300)]
+    parser = offline_parser(pages)
+    validated = []
+    original = Parser.validate_page
+    monkeypatch.setattr(parser, 'validate_page', lambda content: validated.append(content) or original(content))
+
+    assert ids(parser.get_records(1, 'trusted')) == list(range(300))
+    assert len(validated) == 301
+    assert ids(parser.get_records(1, 'trusted')) == list(range(300))
+    assert len(validated) == 301
+    assert not parser.cache._entries
+    assert len(parser.validated_pages) == 301
+
+
+def test_iter_records_matches_get_records_in_every_mode():
+    pages = [page_body([raw_product(i) for i in range(p * 10, p * 10 + 10)], total=35) for p in range(3)]
+    pages.append(page_body([raw_product(i) for i in range(30, 35)], total=35))
+    for mode in VALIDATION_MODES:
+        parser = offline_parser(pages)
+        streamed = [record for page in parser.iter_records(3, mode) for record in page]
+        assert ids(streamed) == ids(parser.get_records(3, mode)) == list(range(35))
@@ -0,0 +1,27 @@
+import pytest
+
+from tests.helpers import FakeCatalogParser, raw_product
+from refresher import Refresher
+from snapshots import SnapshotStore
+
+
+def test_published_frame_is_read_only_and_copies_are_not(tmp_path):
+    parser = FakeCatalogParser([raw_product(1), raw_product(2, promo='Скидка')], skus=[1, 2])
+    refresher = Refresher(parser, SnapshotStore(str(tmp_path)))
+    refresher.refresh()
+    frame = refresher.latest().frame
+
+    with pytest.raises(ValueError):
+        frame.loc[frame.index[0], 'Цена (руб)'] = 1
+    with pytest.raises(ValueError):
+        frame['Общий остаток'] += 1
+    with pytest.raises(ValueError):
+        frame.loc[frame.index[0], 'Акция'] = 'Скидка'
+    assert frame['Цена (руб)'].tolist() == [1000, 1000]
+
+    filtered = frame[frame['ID'] > 1]
+    filtered.loc[filtered.index[0], 'Цена (руб)'] = 1
+    copy = frame.copy()
+    copy['Общий остаток'] += 1
+    assert frame['Общий остаток'].tolist() == [5, 5]
+    assert frame['Акция'].dtype == 'category'
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import resilience
+from resilience import AdaptiveLimit, CircuitBreaker, CircuitOpenError, ParserError, Resilience, RetryPolicy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    return clock
+
+
+def response(status):
+    return SimpleNamespace(status_code=status, headers={})
+
+
+def replies(*outcomes):
+    """send(), который по очереди возвращает ответы и поднимает исключения из outcomes."""
+    outcomes = list(outcomes)
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return response(outcome)
+    return send
+
+
+def open_breaker(guard, host='h'):
+    guard.call(host, replies(500))
+    return guard._breakers[host]
+
+
+def test_breaker_opens_after_threshold_and_closes_after_successful_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()  # одна проба за раз
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED and breaker.allow()
+
+
+@pytest.mark.parametrize('probe', [429, requests.exceptions.ChunkedEncodingError('обрыв'), ValueError('сбой')])
+def test_unsuccessful_probe_reopens_the_breaker(clock, probe):
+    guard = Resilience(RetryPolicy(max_attempts=1), failure_threshold=1, reset_timeout=30)
+    breaker = open_breaker(guard)
+    clock.now += 30
+
+    if isinstance(probe, ValueError):
+        with pytest.raises(ValueError):
+            guard.call('h', replies(probe))
+    elif isinstance(probe, Exception):
+        with pytest.raises(ParserError):
+            guard.call('h', replies(probe))
+    else:
+        assert guard.call('h', replies(probe)).status_code == 429
+
+    assert breaker.state == breaker.OPEN and breaker.opened_at == clock.now
+    with pytest.raises(CircuitOpenError):
+        guard.call('h', replies(200))
+    clock.now += 30
+    assert guard.call('h', replies(200)).status_code == 200
+    assert breaker.state == breaker.CLOSED
+
+
+def test_unsettled_probe_times_out(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_throttling_does_not_count_as_host_failure(clock):
+    guard = Resilience(RetryPolicy(max_attempts=3), failure_threshold=2)
+    assert guard.call('h', replies(429, 429, 200)).status_code == 200
+    assert guard.stats()['h']['circuit'] == 'closed'
+    assert guard.stats()['h']['retries'] == 2
+
+
+def test_retries_server_errors_and_gives_up_on_transport_errors(clock):
+    guard = Resilience(RetryPolicy(max_attempts=3), failure_threshold=10)
+    assert guard.call('h', replies(503, 200)).status_code == 200
+    assert guard.call('h', replies(500, 502, 504)).status_code == 504
+
+    with pytest.raises(ParserError):
+        guard.call('h', replies(*[requests.ConnectionError('нет связи')] * 3))
+    assert guard.stats()['h']['retries'] == 1 + 2 + 2
+
+
+def test_aimd_limit(clock):
+    limit = AdaptiveLimit(maximum=8, cooldown=1.0)
+    limit.on_throttle()
+    assert limit.limit == 4
+    limit.on_throttle()  # та же волна ошибок: не чаще раза в cooldown
+    assert limit.limit == 4
+
+    clock.now += 1
+    limit.on_throttle()
+    assert limit.limit == 2
+    limit.on_success()
+    assert limit.limit == 2.5
+    for _ in range(100):
+        limit.on_success()
+    assert limit.limit == 8
+
+    for _ in range(10):
+        clock.now += 1
+        limit.on_throttle()
+    assert limit.limit == 1
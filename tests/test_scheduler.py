@@ -0,0 +1,36 @@
+import pytest
+
+from ratelimit import RateLimiter, TokenBucket
+from scheduler import CrawlScheduler, CrawlTarget, combined_products
+
+
+def test_same_brand_with_different_suppliers_keeps_both_results(monkeypatch):
+    targets = [CrawlTarget('1', '10'), CrawlTarget('1', '20')]
+    scheduler = CrawlScheduler(targets)
+    monkeypatch.setattr(scheduler, 'crawl_target',
+                        lambda target: {'supplier_id': target.supplier_id, 'products': [{'ID': target.supplier_id}]})
+
+    dataset = scheduler.run()
+
+    assert list(dataset) == targets
+    assert [row['Продавец'] for row in combined_products(dataset)] == ['10', '20']
+
+
+@pytest.mark.parametrize('rate', [0, -1])
+def test_token_bucket_rejects_non_positive_rate(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, 1)
+    with pytest.raises(ValueError):
+        RateLimiter(rate)
+
+
+def test_recorder_is_attached_once_to_the_shared_session(monkeypatch, tmp_path):
+    monkeypatch.setenv('LIDERTEX_RECORD_TO', str(tmp_path / 'records.zip'))
+    scheduler = CrawlScheduler([CrawlTarget('1'), CrawlTarget('2')])
+    recorder = scheduler.session.recorder
+
+    for target in scheduler.targets:
+        scheduler.parser_for(target)
+
+    assert recorder is not None
+    assert scheduler.session.recorder is recorder
@@ -0,0 +1,38 @@
+import numpy as np
+
+from series import parse_series
+
+
+def row(values):
+    return ', '.join(str(v) for v in values)
+
+
+def test_valid_rows_are_parsed_into_the_matrix():
+    parsed = parse_series([row(range(30)), row([1.5] * 30)])
+    assert parsed.valid.tolist() == [True, True]
+    assert parsed.values[0].tolist() == list(map(float, range(30)))
+    assert parsed.total()[0] == 1.5
+
+
+def test_malformed_rows_are_marked_invalid_and_zeroed():
+    values = [
+        row(range(30)),
+        row(range(29)),            # короткий ряд
+        row(range(31)),            # длинный ряд
+        row(['x'] + [1] * 29),     # нечисловое значение
+        None,                      # пропуск
+        '',
+        123,
+    ]
+    parsed = parse_series(values)
+
+    assert parsed.valid.tolist() == [True, False, False, False, False, False, False]
+    assert not parsed.values[1:].any()
+    # Невалидные строки не попадают в сумму
+    assert np.array_equal(parsed.total(), np.arange(30, dtype=float))
+
+
+def test_no_candidates_returns_empty_mask():
+    parsed = parse_series(['1, 2', None], length=30)
+    assert parsed.values.shape == (2, 30)
+    assert not parsed.valid.any()
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from snapshots import SnapshotStore
+
+START = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def products(price):
+    return pd.DataFrame({'ID': [1, 2], 'Цена (руб)': [price, price + 1]})
+
+
+def test_write_prunes_snapshots_older_than_keep_days(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep_days=2, keep_last=0)
+    for day in range(5):
+        store.write(products(100 + day), votes=day, taken_at=START + timedelta(days=day))
+
+    days = sorted(path.name for path in (tmp_path / 'products').iterdir())
+    assert days == ['date=2026-01-03', 'date=2026-01-04', 'date=2026-01-05']
+    assert len(list((tmp_path / 'votes').iterdir())) == 3
+    frame, _ = store.latest()
+    assert frame['Цена (руб)'].tolist() == [104, 105]
+
+
+def test_keep_last_limits_snapshot_count_but_never_drops_the_latest(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep_days=0, keep_last=2)
+    for minute in range(4):
+        store.write(products(100 + minute), taken_at=START + timedelta(minutes=minute))
+
+    assert len(list(tmp_path.glob('products/date=*/*.parquet'))) == 2
+    history = store.history(['Цена (руб)'])
+    assert sorted(set(history['Цена (руб)'])) == [102, 103, 104]
+
+    # Даже очень старый единственный снимок остаётся: с него стартует приложение
+    store = SnapshotStore(str(tmp_path / 'old'), keep_days=1)
+    store.write(products(1), taken_at=START)
+    assert store.prune(now=START + timedelta(days=30)) == 0
+    assert store.latest_path() is not None
+
+
+def test_history_is_kept_by_default(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    for day in range(0, 400, 100):
+        store.write(products(day), taken_at=START + timedelta(days=day))
+
+    assert len(list(tmp_path.glob('products/date=*/*.parquet'))) == 4
+
+
+def test_empty_snapshot_has_its_moment(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    taken_at = START + timedelta(microseconds=123)
+    store.write(products(1).iloc[:0], taken_at=taken_at)
+
+    frame, restored_at = store.latest()
+    assert frame.empty
+    assert restored_at == taken_at
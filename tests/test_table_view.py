@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from table_view import page_count, stock_styles, table_page
+
+
+def test_stock_styles_by_thresholds():
+    styles = stock_styles([0, 29, 30, 99, 100, np.nan])
+
+    assert styles.tolist() == ['color: red', 'color: red', 'color: yellow', 'color: yellow',
+                               'color: lightgreen', '']
+
+
+def test_page_count():
+    assert page_count(0, 50) == 1
+    assert page_count(50, 50) == 1
+    assert page_count(51, 50) == 2
+
+
+def test_table_page_sorts_before_paging_and_keeps_ties_stable():
+    df = pd.DataFrame({'Цена (руб)': [300, 100, 200, 100], 'Название': ['в', 'а', 'б', 'г']},
+                      index=[10, 11, 12, 13])
+
+    assert table_page(df, page=2, page_size=3).index.tolist() == [13]
+    assert table_page(df, 'Цена (руб)', page_size=3).index.tolist() == [11, 13, 12]
+    assert table_page(df, 'Цена (руб)', ascending=False, page_size=2).index.tolist() == [10, 12]
+    assert table_page(df, 'Цена (руб)', ascending=False, page=2, page_size=2).index.tolist() == [11, 13]
+    assert table_page(df, 'Название', ascending=False, page_size=2)['Название'].tolist() == ['г', 'в']